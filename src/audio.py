@@ -1,51 +1,314 @@
 # src/audio.py
-import subprocess
+import wave
 from pathlib import Path
 
-def make_silence_wav(path: Path, seconds: float = 0.5, rate: int = 22050):
-    """Create a mono WAV file of silence using ffmpeg."""
+from . import profiling
+
+def make_silence_wav(path: Path, seconds: float = 0.5, rate: int = 22050,
+                     channels: int = 1, sample_width: int = 2):
+    """
+    Create a WAV file of silence (written directly, no ffmpeg spawn).
+    Returns (path, frames) so callers can track exact sample counts.
+    """
     path.parent.mkdir(parents=True, exist_ok=True)
-    subprocess.run([
-        "ffmpeg", "-y",
-        "-f", "lavfi",
-        f"-i", f"anullsrc=r={rate}:cl=mono",
-        "-t", f"{seconds}",
-        str(path),
-    ], check=True)
+    frames = int(round(seconds * rate))
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(sample_width)
+        w.setframerate(rate)
+        w.writeframes(b"\x00" * (frames * channels * sample_width))
+    return path, frames
+
+def write_ffmetadata(chapters, path: Path) -> Path:
+    """Write an ffmpeg FFMETADATA1 file with one [CHAPTER] per entry (ms timebase)."""
+    def esc(s: str) -> str:
+        for ch in ("\\", "=", ";", "#", "\n"):
+            s = s.replace(ch, "\\" + ch)
+        return s
+
+    lines = [";FFMETADATA1"]
+    for ch in chapters:
+        lines += [
+            "[CHAPTER]",
+            "TIMEBASE=1/1000",
+            f"START={int(ch['start_ms'])}",
+            f"END={int(ch['end_ms'])}",
+            f"title={esc(ch['title'])}",
+        ]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
     return path
 
-def ffmpeg_join_and_normalize(wavs, out_mp3: Path):
+LOUDNORM = "loudnorm=I=-16:TP=-1.5:LRA=11"
+
+# Speech-sized renditions. The first one is the primary (published in the feed)
+# and is written to the path passed to ffmpeg_join_and_normalize.
+DEFAULT_RENDITIONS = [
+    {"ext": "mp3", "codec": "libmp3lame", "bitrate": "64k", "channels": 1, "rate": 44100},
+    {"ext": "opus", "codec": "libopus", "bitrate": "24k", "channels": 1, "rate": 48000},
+]
+
+_CODECS = {"mp3": "libmp3lame", "opus": "libopus", "m4a": "aac", "aac": "aac"}
+_RATES = {"opus": 48000}
+
+def parse_renditions(spec: str):
+    """
+    "mp3:64k,opus:24k" → rendition dicts (mono). The first entry must be mp3,
+    since the feed enclosure is audio/mpeg.
+    """
+    out = []
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        ext, _, bitrate = part.partition(":")
+        ext = ext.strip().lower()
+        if ext not in _CODECS:
+            raise ValueError(f"unsupported rendition format: {ext!r}")
+        out.append({
+            "ext": ext,
+            "codec": _CODECS[ext],
+            "bitrate": bitrate.strip() or "64k",
+            "channels": 1,
+            "rate": _RATES.get(ext, 44100),
+        })
+    if not out:
+        return list(DEFAULT_RENDITIONS)
+    if out[0]["ext"] != "mp3":
+        raise ValueError("the first (primary) rendition must be mp3")
+    return out
+
+def rendition_paths(out_mp3: Path, renditions):
+    """Primary → out_mp3; others → same stem with their own extension."""
+    paths = [out_mp3]
+    for r in renditions[1:]:
+        paths.append(out_mp3.with_suffix("." + r["ext"]))
+    return paths
+
+def _codec_args(r):
+    return [
+        "-c:a", r["codec"],
+        "-b:a", r["bitrate"],
+        "-ac", str(r["channels"]),
+        "-ar", str(r["rate"]),
+    ]
+
+def ffmpeg_join_and_normalize(wavs, out_mp3: Path, chapters=None, renditions=None):
+    """
+    Concat + loudness-normalize WAVs once and encode every rendition from that
+    single decode (one ffmpeg process, one filter graph with asplit).
+    `chapters` ([{"title", "start_ms", "end_ms"}], see src.timing) are written
+    as ID3 CHAP frames (mp3) / chapter comments (ogg).
+    Returns the primary output path (out_mp3).
+    """
     out_mp3.parent.mkdir(parents=True, exist_ok=True)
+    renditions = renditions or DEFAULT_RENDITIONS
 
-    # If there is only one WAV, skip concat and normalize directly
     if len(wavs) == 1:
-        inp = Path(wavs[0]).resolve()
-        subprocess.run([
-            "ffmpeg", "-y", "-i", str(inp),
-            "-af", "loudnorm=I=-16:TP=-1.5:LRA=11",
-            "-b:a", "128k",
-            str(out_mp3)
-        ], check=True)
-        return out_mp3
-
-    # Otherwise, concat multiple WAVs using absolute paths
-    list_file = out_mp3.parent / "concat.txt"
-    with open(list_file, "w") as f:
-        for w in wavs:
-            f.write(f"file '{Path(w).resolve()}'\n")
-
-    temp = out_mp3.parent / "temp_concat.wav"
-    subprocess.run([
-        "ffmpeg", "-y", "-f", "concat", "-safe", "0",
-        "-i", str(list_file),
-        "-c", "copy", str(temp)
-    ], check=True)
+        inp = ["-i", str(Path(wavs[0]).resolve())]
+    else:
+        # Concat demuxer feeds the filter graph directly (no temp WAV)
+        list_file = out_mp3.parent / "concat.txt"
+        with open(list_file, "w") as f:
+            for w in wavs:
+                f.write(f"file '{Path(w).resolve()}'\n")
+        inp = ["-f", "concat", "-safe", "0", "-i", str(list_file)]
+
+    meta_in = []
+    if chapters:
+        meta = write_ffmetadata(chapters, out_mp3.parent / "chapters.txt")
+        meta_in = ["-f", "ffmetadata", "-i", str(meta)]
+
+    n = len(renditions)
+    labels = [f"[r{i}]" for i in range(n)]
+    graph = f"[0:a]{LOUDNORM}" + (f",asplit={n}" if n > 1 else "") + "".join(labels)
 
-    subprocess.run([
-        "ffmpeg", "-y", "-i", str(temp),
-        "-af", "loudnorm=I=-16:TP=-1.5:LRA=11",
-        "-b:a", "128k",
-        str(out_mp3)
+    outputs = []
+    for label, r, path in zip(labels, renditions, rendition_paths(out_mp3, renditions)):
+        outputs += ["-map", label]
+        if chapters:
+            outputs += ["-map_metadata", "1", "-map_chapters", "1"]
+        outputs += _codec_args(r)
+        if r["ext"] == "mp3":
+            outputs += ["-id3v2_version", "3"]
+        outputs.append(str(path))
+
+    profiling.run([
+        "ffmpeg", "-y",
+        *inp,
+        *meta_in,
+        "-filter_complex", graph,
+        *outputs,
     ], check=True)
 
-    return out_mp3
\ No newline at end of file
+    return out_mp3
+
+
+# ---------- per-segment encoding (--segment_encode) ----------
+# Instead of one loudnorm pass over the finished episode, every WAV segment is
+# encoded to every rendition as soon as it exists, with one fixed gain for the
+# whole episode, and the encoded segments are joined with `-c copy`.
+TARGET_RMS_DBFS = -20.0   # speech RMS; lands near -16 LUFS after the limiter
+MAX_GAIN_DB = 20.0
+LIMITER = "alimiter=limit=0.84:level=disabled"   # ≈ -1.5 dBTP
+
+_MP3_BITRATES = {  # kbps by bitrate index: MPEG-1 / MPEG-2(.5) layer III
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+def wav_rms_dbfs(path: Path):
+    """RMS level of a 16-bit WAV in dBFS (None for other sample widths or silence)."""
+    import numpy as np
+
+    with wave.open(str(path), "rb") as w:
+        if w.getsampwidth() != 2:
+            return None
+        pcm = np.frombuffer(w.readframes(w.getnframes()), dtype="<i2").astype(np.float64)
+    if not pcm.size:
+        return None
+    rms = float(np.sqrt(np.mean(pcm * pcm))) / 32768.0
+    return 20 * np.log10(rms) if rms > 0 else None
+
+def mp3_samples(path: Path) -> int:
+    """Decoded sample count of an MP3 (frame headers only, no decoding)."""
+    data = Path(path).read_bytes()
+    i = 0
+    if data[:3] == b"ID3":
+        i = 10 + ((data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F))
+    samples = 0
+    while i + 4 <= len(data):
+        b1, b2, b3 = data[i + 1], data[i + 2], data[i + 3]
+        if data[i] != 0xFF or (b1 & 0xE0) != 0xE0 or (b1 >> 1) & 3 != 1:  # sync + layer III
+            i += 1
+            continue
+        version = (b1 >> 3) & 3
+        kbps = _MP3_BITRATES[1 if version == 3 else 2][(b2 >> 4) & 0xF] if (b2 >> 4) & 0xF < 15 else 0
+        rate_idx = (b2 >> 2) & 3
+        if version == 1 or not kbps or rate_idx == 3:
+            i += 1
+            continue
+        rate = _MP3_RATES[version][rate_idx]
+        per_frame = 1152 if version == 3 else 576
+        i += per_frame // 8 * kbps * 1000 // rate + ((b2 >> 1) & 1)
+        samples += per_frame
+    return samples
+
+class SegmentEncoder:
+    """
+    Encodes WAV segments on a thread pool as TTS produces them (pass
+    `submit` as synthesize_paragraphs' on_segment), then `finish` joins the
+    encoded segments per rendition without re-encoding. Identical pauses are
+    encoded once and reused.
+
+    Every encoded segment keeps its own encoder delay and padding, so the
+    joined episode is longer than the WAVs; `duration` is the joined MP3's
+    real length (set by `finish`).
+    """
+
+    def __init__(self, out_dir: Path, renditions=None, workers: int = 0):
+        import os
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.dir = Path(out_dir) / "segments"
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.renditions = renditions or DEFAULT_RENDITIONS
+        self.gain_db = None
+        self._pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        self._order = []     # (future, [encoded path per rendition]) per segment, in episode order
+        self._pauses = {}    # (frames, rate, channels) -> entry in _order
+        self.duration = None
+
+    def submit(self, wav: Path, kind: str = "speech") -> None:
+        wav = Path(wav)
+        if kind == "pause":
+            with wave.open(str(wav), "rb") as w:
+                key = (w.getnframes(), w.getframerate(), w.getnchannels())
+            if key in self._pauses:
+                self._order.append(self._pauses[key])
+                return
+        elif self.gain_db is None:
+            # One gain for the whole episode, set from the first paragraph:
+            # Piper's level is steady within a voice, and per-segment gains
+            # would pump between stories.
+            rms = wav_rms_dbfs(wav)
+            self.gain_db = 0.0 if rms is None else min(MAX_GAIN_DB, TARGET_RMS_DBFS - rms)
+
+        outs = [self.dir / f"{wav.stem}.{r['ext']}" for r in self.renditions]
+        entry = (self._pool.submit(self._encode, wav, outs, self.gain_db or 0.0), outs)
+        self._order.append(entry)
+        if kind == "pause":
+            self._pauses[key] = entry
+
+    def _encode(self, wav: Path, outs, gain_db: float) -> None:
+        n = len(self.renditions)
+        labels = [f"[r{i}]" for i in range(n)]
+        graph = f"[0:a]volume={gain_db:.2f}dB,{LIMITER}" + (f",asplit={n}" if n > 1 else "") + "".join(labels)
+        outputs = []
+        for label, r, path in zip(labels, self.renditions, outs):
+            outputs += ["-map", label, *_codec_args(r)]
+            if r["ext"] == "mp3":
+                outputs += ["-id3v2_version", "0", "-write_xing", "0"]
+            outputs.append(str(path))
+        profiling.run(["ffmpeg", "-y", "-v", "error", "-i", str(wav),
+                       "-filter_complex", graph, *outputs], check=True)
+
+    def _mp3_lengths(self):
+        """Decoded sample count of each encoded segment (first rendition), in episode order."""
+        lengths = {}
+        for _, outs in self._order:
+            if outs[0] not in lengths:
+                lengths[outs[0]] = mp3_samples(outs[0])
+        return [lengths[outs[0]] for _, outs in self._order]
+
+    def _chapters(self, manifest, lengths):
+        """Chapters re-timed to the encoded MP3 segments, which carry encoder padding."""
+        from .timing import chapters_from_manifest
+
+        if not manifest or len(manifest.get("segments", [])) != len(self._order):
+            return chapters_from_manifest(manifest)
+        start, segs = 0, []
+        for seg, n in zip(manifest["segments"], lengths):
+            segs.append(dict(seg, start_sample=start, samples=n))
+            start += n
+        rate = self.renditions[0]["rate"]
+        return chapters_from_manifest({"sample_rate": rate, "total_samples": start, "segments": segs})
+
+    def finish(self, out_mp3: Path, manifest=None):
+        """
+        Wait for all segments, then concat each rendition with -c copy.
+        Returns chapters; `duration` is set to the joined MP3's length.
+        """
+        try:
+            for fut, _ in self._order:
+                fut.result()
+            lengths = self._mp3_lengths()
+            self.duration = sum(lengths) / self.renditions[0]["rate"]
+            chapters = self._chapters(manifest, lengths)
+            meta_in = []
+            if chapters:
+                meta = write_ffmetadata(chapters, out_mp3.parent / "chapters.txt")
+                meta_in = ["-f", "ffmetadata", "-i", str(meta)]
+
+            jobs = []
+            for i, (r, path) in enumerate(zip(self.renditions, rendition_paths(out_mp3, self.renditions))):
+                list_file = self.dir / f"concat_{r['ext']}.txt"
+                with open(list_file, "w") as f:
+                    for _, outs in self._order:
+                        f.write(f"file '{outs[i].resolve()}'\n")
+                cmd = ["ffmpeg", "-y", "-v", "error", "-f", "concat", "-safe", "0", "-i", str(list_file),
+                       *meta_in, "-map", "0:a"]
+                if chapters:
+                    cmd += ["-map_metadata", "1", "-map_chapters", "1"]
+                cmd += ["-c", "copy"]
+                if r["ext"] == "mp3":
+                    cmd += ["-id3v2_version", "3"]
+                jobs.append(self._pool.submit(profiling.run, cmd + [str(path)], check=True))
+            for job in jobs:
+                job.result()
+            return chapters
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
@@ -1,12 +1,14 @@
 # src/cleaner.py
 import hashlib
 import re
-import requests
-from bs4 import BeautifulSoup
+
+# bs4/lxml and requests are imported inside the helpers that use them so that
+# importing this module (e.g. for hash_key) stays cheap.
 
 def strip_html(html: str) -> str:
     if not html:
         return ""
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html, "lxml")
     for s in soup.select("script, style, noscript"):
         s.decompose()
@@ -20,6 +22,9 @@ def fetch_and_readable(url: str) -> str:
     If readability/lxml_html_clean aren't installed, or fetch fails,
     fall back to a simple BeautifulSoup text extraction.
     """
+    import requests
+    from bs4 import BeautifulSoup
+
     try:
         r = requests.get(url, timeout=15, headers={"User-Agent": "news-bot/1.0"})
         r.raise_for_status()
@@ -56,5 +61,6 @@ def hash_key(s: str) -> str:
 
 def extract_links_from_html(html: str):
     """Optional helper if you need to collect <a href> links from an email."""
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html or "", "lxml")
     return [a.get("href") for a in soup.find_all("a", href=True)]
\ No newline at end of file
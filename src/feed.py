@@ -8,6 +8,8 @@ import sys
 import urllib.request
 import xml.etree.ElementTree as ET
 
+from src.timing import load_manifest, format_duration
+
 FEED_PATH = Path("feed.xml")
 OUT_DIR = Path("output")
 AUDIO_NAME = "episode.mp3"
@@ -21,9 +23,9 @@ def _env(name: str, default: str = "") -> str:
     return os.getenv(name, default).strip()
 
 
-def _today_title() -> str:
+def _today_title(now: Optional[datetime] = None) -> str:
     """Return 'Mon Day Year' (e.g., 'Sep 22 2025') in UTC."""
-    now = datetime.now(timezone.utc)
+    now = now or datetime.now(timezone.utc)
     day_fmt = "%#d" if os.name == "nt" else "%-d"
     try:
         return now.strftime(f"%b {day_fmt} %Y")
@@ -47,21 +49,33 @@ def _feed_self_url() -> str:
     return _public_base() + "feed.xml"
 
 
-def _rfc2822_now() -> str:
-    return datetime.now(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S +0000")
+def _rfc2822_now(now: Optional[datetime] = None) -> str:
+    return (now or datetime.now(timezone.utc)).strftime("%a, %d %b %Y %H:%M:%S +0000")
 
 
-def _read_description_html() -> str:
+def _read_description_html(out_dir: Path = OUT_DIR) -> str:
     """Prefer notes.html; fallback to notes.md (escaped)."""
-    html = OUT_DIR / "notes.html"
+    html = out_dir / "notes.html"
     if html.exists():
         return html.read_text(encoding="utf-8")
-    md = OUT_DIR / "notes.md"
+    md = out_dir / "notes.md"
     if md.exists():
         return f"<pre>{escape(md.read_text(encoding='utf-8'))}</pre>"
     return "<p>Episode notes unavailable.</p>"
 
 
+def _episode_duration(out_dir: Path = OUT_DIR) -> Optional[str]:
+    """
+    itunes:duration from the segment manifest written during TTS (no MP3
+    probe); the measured length of a --segment_encode join takes precedence.
+    """
+    manifest = load_manifest(out_dir)
+    if not manifest:
+        return None
+    seconds = manifest.get("encoded_duration") or manifest.get("duration")
+    return format_duration(seconds) if seconds else None
+
+
 def _try_restore_feed_from_pages() -> None:
     """If feed.xml is missing, try to fetch the live Pages feed."""
     if FEED_PATH.exists():
@@ -136,12 +150,25 @@ def _set_itunes_channel_tags(channel: ET.Element) -> None:
             it_cat.set("text", raw_cat)
 
 
+def _parse_feed() -> ET.ElementTree:
+    """Parse feed.xml, repairing the duplicate xmlns:itunes older versions wrote."""
+    try:
+        return ET.parse(FEED_PATH)
+    except ET.ParseError:
+        data = FEED_PATH.read_text(encoding="utf-8")
+        decl = f' xmlns:itunes="{NS_ITUNES}"'
+        head, sep, rest = data.partition(decl)
+        if not sep or decl not in rest:
+            raise
+        return ET.ElementTree(ET.fromstring(head + sep + rest.replace(decl, "", 1)))
+
+
 def _load_or_init_tree():
     _try_restore_feed_from_pages()
 
     if FEED_PATH.exists():
         try:
-            tree = ET.parse(FEED_PATH)
+            tree = _parse_feed()
             root = tree.getroot()
             channel = root.find("channel")
             if channel is None:
@@ -161,7 +188,9 @@ def _load_or_init_tree():
             pass  # fall through to new feed
 
     # create a new feed
-    rss = ET.Element("rss", attrib={"version": "2.0", "xmlns:itunes": NS_ITUNES})
+    # xmlns:itunes is emitted by ElementTree (register_namespace above);
+    # setting it here as well wrote it twice and made the feed unparseable.
+    rss = ET.Element("rss", attrib={"version": "2.0"})
     channel = ET.SubElement(rss, "channel")
     _ensure_text(channel, "title", _env("PODCAST_TITLE", "Fintech Daily Briefing"))
     _ensure_text(channel, "link", _public_base())
@@ -189,7 +218,9 @@ def _existing_guids(channel: ET.Element):
 def _add_item(channel: ET.Element, *,
               tag: str, title: str, description_html: str,
               enclosure_url: str, enclosure_len: int,
-              episode_image: Optional[str]) -> None:
+              episode_image: Optional[str],
+              duration: Optional[str] = None,
+              pub_date: Optional[datetime] = None) -> None:
     item = ET.Element("item")
 
     t = ET.SubElement(item, "title")
@@ -208,7 +239,11 @@ def _add_item(channel: ET.Element, *,
     enc.set("type", "audio/mpeg")
 
     pd = ET.SubElement(item, "pubDate")
-    pd.text = _rfc2822_now()
+    pd.text = _rfc2822_now(pub_date)
+
+    if duration:
+        it_dur = ET.SubElement(item, "{%s}duration" % NS_ITUNES)
+        it_dur.text = duration
 
     if episode_image:
         it_img = ET.SubElement(item, "{%s}image" % NS_ITUNES)
@@ -222,52 +257,100 @@ def episode_asset_url(tag: str) -> str:
     return f"https://github.com/{repo}/releases/download/{tag}/{AUDIO_NAME}"
 
 
-def update_feed_for_today(tag: str, *,
-                          title: Optional[str] = None,
-                          summary_html: Optional[str] = None) -> None:
-    tree, root, channel = _load_or_init_tree()
-
-    # dedupe by guid
-    if tag in _existing_guids(channel):
-        lb = channel.find("lastBuildDate")
-        if lb is None:
-            lb = ET.SubElement(channel, "lastBuildDate")
-        lb.text = _rfc2822_now()
-        tree.write(FEED_PATH, encoding="utf-8", xml_declaration=True)
-        return
-
-    ep_title = title or _today_title()
-    desc_html = summary_html if summary_html is not None else _read_description_html()
-    audio_url = episode_asset_url(tag)
-    audio_path = OUT_DIR / AUDIO_NAME
-    enclosure_len = audio_path.stat().st_size if audio_path.exists() else 0
-    episode_image = _env("EPISODE_IMAGE_URL") or _env("PODCAST_COVER_URL")
-
-    _add_item(
-        channel,
-        tag=tag,
-        title=ep_title,
-        description_html=desc_html,
-        enclosure_url=audio_url,
-        enclosure_len=enclosure_len,
-        episode_image=episode_image,
-    )
-
+def _touch_last_build(channel: ET.Element) -> None:
     lb = channel.find("lastBuildDate")
     if lb is None:
         lb = ET.SubElement(channel, "lastBuildDate")
     lb.text = _rfc2822_now()
 
+
+def update_feed_for_episodes(episodes) -> int:
+    """
+    Add several episodes in one read/write of feed.xml. Each episode is a dict
+    with "tag" and optionally "title", "out_dir", "pub_date" (datetime) and
+    "summary_html". Tags already in the feed are skipped. Returns how many
+    were added.
+    """
+    tree, root, channel = _load_or_init_tree()
+    existing = _existing_guids(channel)
+    episode_image = _env("EPISODE_IMAGE_URL") or _env("PODCAST_COVER_URL")
+
+    added = 0
+    for ep in episodes:
+        tag = ep["tag"]
+        if tag in existing:
+            continue
+        out_dir = Path(ep.get("out_dir") or OUT_DIR)
+        summary_html = ep.get("summary_html")
+        audio_path = out_dir / AUDIO_NAME
+        _add_item(
+            channel,
+            tag=tag,
+            title=ep.get("title") or _today_title(ep.get("pub_date")),
+            description_html=summary_html if summary_html is not None else _read_description_html(out_dir),
+            enclosure_url=episode_asset_url(tag),
+            enclosure_len=audio_path.stat().st_size if audio_path.exists() else 0,
+            episode_image=episode_image,
+            duration=_episode_duration(out_dir),
+            pub_date=ep.get("pub_date"),
+        )
+        existing.add(tag)
+        added += 1
+
+    _touch_last_build(channel)
     tree.write(FEED_PATH, encoding="utf-8", xml_declaration=True)
+    return added
+
+
+def update_feed_for_today(tag: str, *,
+                          title: Optional[str] = None,
+                          summary_html: Optional[str] = None) -> None:
+    update_feed_for_episodes([{"tag": tag, "title": title, "summary_html": summary_html}])
+
+
+def backfill_episodes(backfill_dir: Path, tag_prefix: str = "episode-backfill-",
+                      releases_uploaded: bool = False):
+    """
+    Episodes built by `main.py --backfill`: one per output/backfill/<YYYY-MM-DD>/
+    with audio. Their enclosures point at releases `<tag_prefix><date>`, which
+    nothing here creates, so the caller must confirm they were uploaded.
+    """
+    if not releases_uploaded:
+        raise SystemExit(
+            f"upload each day's {AUDIO_NAME} to a release tagged {tag_prefix}<YYYY-MM-DD> first, "
+            "then pass --releases_uploaded (the workflow's backfill run does both)")
+    episodes = []
+    for d in sorted(Path(backfill_dir).iterdir()):
+        try:
+            day = datetime.strptime(d.name, "%Y-%m-%d").replace(hour=12, tzinfo=timezone.utc)
+        except ValueError:
+            continue
+        if (d / AUDIO_NAME).exists():
+            episodes.append({"tag": tag_prefix + d.name, "out_dir": d, "pub_date": day})
+    return episodes
 
 
 # ---------- CLI ----------
 if __name__ == "__main__":
     # Usage:
-    #   python -m src.feed --update --tag <TAG> [--title "Sep 22 2025"]
-    if "--update" in sys.argv and "--tag" in sys.argv:
+    #   python -m src.feed --update --tag <TAG> [--title "Sep 22 2025"] [--profile]
+    #   python -m src.feed --backfill output/backfill --releases_uploaded [--tag_prefix episode-backfill-]
+    if "--backfill" in sys.argv:
+        prefix = "episode-backfill-"
+        if "--tag_prefix" in sys.argv:
+            prefix = sys.argv[sys.argv.index("--tag_prefix") + 1]
+        eps = backfill_episodes(Path(sys.argv[sys.argv.index("--backfill") + 1]), prefix,
+                                releases_uploaded="--releases_uploaded" in sys.argv)
+        n = update_feed_for_episodes(eps)
+        print(f"Added {n} of {len(eps)} backfilled episodes to {FEED_PATH}")
+    elif "--update" in sys.argv and "--tag" in sys.argv:
+        from src import profiling
+
         tag = sys.argv[sys.argv.index("--tag") + 1]
         t = None
         if "--title" in sys.argv:
             t = sys.argv[sys.argv.index("--title") + 1]
-        update_feed_for_today(tag, title=t)
\ No newline at end of file
+        if "--profile" in sys.argv:
+            profiling.enable(Path("output") / "profile", append=True)
+        with profiling.stage("feed_update"):
+            update_feed_for_today(tag, title=t)
\ No newline at end of file
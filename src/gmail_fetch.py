@@ -1,31 +1,110 @@
 import base64
+import hashlib
+import json
+import os
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import List, Dict
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
 
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 
+# Trimmed copy of Gmail's discovery document (regenerate: tools/trim_discovery.py)
+DISCOVERY_DOC = Path(__file__).resolve().parent / "discovery" / "gmail.v1.json"
+DEFAULT_TOKEN_URI = "https://oauth2.googleapis.com/token"
+DEFAULT_TOKEN_CACHE = Path.home() / ".cache" / "newsletter-to-podcast" / "gmail_token.json"
 
-def gmail_service(client_id: str, client_secret: str, refresh_token: str):
-    """Builds an authenticated Gmail API service using OAuth refresh token."""
+
+def _token_cache_path() -> Path:
+    return Path(os.getenv("GMAIL_TOKEN_CACHE") or DEFAULT_TOKEN_CACHE).expanduser()
+
+
+def _cache_key(client_id: str, refresh_token: str) -> str:
+    # Never reuse an access token minted for another client/account.
+    return hashlib.sha256(f"{client_id}:{refresh_token}".encode("utf-8")).hexdigest()
+
+
+def _load_cached_token(path: Path, key: str):
+    """(token, expiry) from the cache if it belongs to `key`, else (None, None)."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("key") != key:
+            return None, None
+        # google-auth compares expiry as naive UTC
+        expiry = datetime.fromisoformat(data["expiry"]).replace(tzinfo=None)
+        return data["token"], expiry
+    except Exception:
+        return None, None
+
+
+def _save_cached_token(path: Path, key: str, creds) -> None:
+    if not creds.token or not creds.expiry:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "key": key,
+            "token": creds.token,
+            "expiry": creds.expiry.isoformat(),
+        }), encoding="utf-8")
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # cache is best-effort
+
+
+def gmail_credentials(client_id: str, client_secret: str, refresh_token: str):
+    """
+    OAuth credentials that reuse a cached access token until it expires and
+    only hit the token endpoint (GMAIL_TOKEN_URI) when they must.
+    """
+    from google.oauth2.credentials import Credentials
+    from google.auth.transport.requests import Request
+
+    cache = _token_cache_path()
+    key = _cache_key(client_id or "", refresh_token or "")
+    token, expiry = _load_cached_token(cache, key)
     creds = Credentials(
-        None,
+        token,
         refresh_token=refresh_token,
-        token_uri="https://oauth2.googleapis.com/token",
+        token_uri=os.getenv("GMAIL_TOKEN_URI") or DEFAULT_TOKEN_URI,
         client_id=client_id,
         client_secret=client_secret,
         scopes=SCOPES,
+        expiry=expiry,
     )
+    if not creds.valid:
+        creds.refresh(Request())
+        _save_cached_token(cache, key, creds)
+    return creds
+
+
+def gmail_service(client_id: str, client_secret: str, refresh_token: str):
+    """
+    Builds an authenticated Gmail API service using OAuth refresh token.
+    The client is built from the bundled discovery document, so startup
+    needs no network beyond a token refresh (and none while the cached
+    access token is still valid).
+    """
+    # Imported here: googleapiclient + google-auth dominate startup time.
+    from googleapiclient.discovery import build, build_from_document
+
+    creds = gmail_credentials(client_id, client_secret, refresh_token)
+    if DISCOVERY_DOC.exists():
+        doc = json.loads(DISCOVERY_DOC.read_text(encoding="utf-8"))
+        return build_from_document(doc, credentials=creds)
     return build("gmail", "v1", credentials=creds, cache_discovery=False)
 
 
-def list_messages(svc, label: str, since_days: int = 1) -> List[Dict]:
+def list_messages(svc, label: str, since_days: int = 1, before=None) -> List[Dict]:
     """
-    Return a list of message metadata IDs for a given label within the last `since_days`.
+    Return a list of message metadata IDs for a given label within the last `since_days`
+    (and, if `before` is a date, received before that day).
     """
     q_time = (datetime.now(timezone.utc) - timedelta(days=since_days)).strftime("%Y/%m/%d")
     query = f"label:{label} after:{q_time}"
+    if before is not None:
+        query += f" before:{before.strftime('%Y/%m/%d')}"
     msgs = []
     resp = svc.users().messages().list(userId="me", q=query, maxResults=50).execute()
     msgs.extend(resp.get("messages", []))
@@ -40,39 +119,79 @@ def list_messages(svc, label: str, since_days: int = 1) -> List[Dict]:
     return msgs
 
 
-def get_message(svc, msg_id: str) -> Dict:
-    """Fetch full message content by ID."""
-    return svc.users().messages().get(userId="me", id=msg_id, format="full").execute()
+# Only what extract_email_html/guess_source read: drops snippet, labelIds,
+# historyId, sizeEstimate, raw, and every part-level key we don't inspect.
+_PART_FIELDS = "mimeType,filename,headers(name,value),body(size,data,attachmentId)"
 
 
-def extract_email_html(msg: Dict) -> str:
+def _parts_mask(depth: int) -> str:
+    """Fields mask for `depth` levels of nested multipart."""
+    mask = _PART_FIELDS
+    for _ in range(depth):
+        mask = f"{_PART_FIELDS},parts({mask})"
+    return mask
+
+
+MESSAGE_FIELDS = f"id,internalDate,payload({_parts_mask(5)})"
+
+# Text bodies bigger than this are not decoded (newsletters are ~50-300 KB).
+MAX_TEXT_PART_BYTES = 5 * 1024 * 1024
+
+
+def get_message(svc, msg_id: str, fields: str = MESSAGE_FIELDS) -> Dict:
     """
-    Extract HTML (or plain text as fallback) from a Gmail message payload.
+    Fetch message content by ID, trimmed to `fields` (pass None for everything).
+    Attachments only come back as metadata (attachmentId) and are never fetched.
     """
-    payload = msg.get("payload", {})
-    parts = payload.get("parts", [])
+    kwargs = {"userId": "me", "id": msg_id, "format": "full"}
+    if fields:
+        kwargs["fields"] = fields
+    return svc.users().messages().get(**kwargs).execute()
 
-    # Check top-level HTML
-    if payload.get("mimeType") == "text/html" and payload.get("body", {}).get("data"):
-        data = payload["body"]["data"]
-        return base64.urlsafe_b64decode(data).decode("utf-8", errors="ignore")
 
-    # Look through multipart sections
-    for p in parts:
-        if p.get("mimeType") == "text/html" and p.get("body", {}).get("data"):
-            data = p["body"]["data"]
-            return base64.urlsafe_b64decode(data).decode("utf-8", errors="ignore")
+def payload_bytes(msg: Dict) -> int:
+    """Approximate size of the JSON response for `msg` (before transport compression)."""
+    return len(json.dumps(msg, separators=(",", ":")))
 
-    # Fallback: plain text
-    if payload.get("mimeType") == "text/plain" and payload.get("body", {}).get("data"):
-        data = payload["body"]["data"]
-        return base64.urlsafe_b64decode(data).decode("utf-8", errors="ignore")
 
-    for p in parts:
-        if p.get("mimeType") == "text/plain" and p.get("body", {}).get("data"):
-            data = p["body"]["data"]
-            return base64.urlsafe_b64decode(data).decode("utf-8", errors="ignore")
+def _is_attachment(part: Dict) -> bool:
+    if part.get("filename") or part.get("body", {}).get("attachmentId"):
+        return True
+    for h in part.get("headers", []) or []:
+        if h.get("name", "").lower() == "content-disposition":
+            return h.get("value", "").lower().startswith("attachment")
+    return False
+
+
+def _walk_text_parts(part: Dict):
+    """Yield text/* leaf parts depth-first, skipping attachments and non-text subtrees."""
+    mime = (part.get("mimeType") or "").lower()
+    if mime.startswith("multipart/"):
+        for child in part.get("parts", []) or []:
+            yield from _walk_text_parts(child)
+        return
+    if mime in ("text/html", "text/plain") and not _is_attachment(part):
+        body = part.get("body", {})
+        if body.get("data") and body.get("size", 0) <= MAX_TEXT_PART_BYTES:
+            yield mime, body["data"]
+    # images, calendars, attachments … are never decoded
 
+
+def extract_email_html(msg: Dict) -> str:
+    """
+    Extract HTML (or plain text as fallback) from a Gmail message payload,
+    searching nested multipart trees. The first HTML part wins; otherwise
+    the first plain-text part.
+    """
+    payload = msg.get("payload", {})
+    plain = None
+    for mime, data in _walk_text_parts(payload):
+        if mime == "text/html":
+            return base64.urlsafe_b64decode(data).decode("utf-8", errors="ignore")
+        if plain is None:
+            plain = data
+    if plain is not None:
+        return base64.urlsafe_b64decode(plain).decode("utf-8", errors="ignore")
     return ""
 
 
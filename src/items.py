@@ -0,0 +1,162 @@
+# src/items.py
+"""
+Compact newsletter items and an optional disk-backed spool.
+
+Item keeps one copy of the cleaned text in a slotted record. It still offers
+dict-style .get() so code written against the old item dicts keeps working.
+ItemSpool appends items to a JSONL file and iterates them lazily, so peak
+memory doesn't grow with the backfill window. pick() gives a lazy view of
+chosen items in a new order (e.g. ranked), read back by file offset.
+"""
+import json
+import sys
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
+
+
+class Item:
+    __slots__ = ("title", "source", "text", "link", "labels", "aired_on", "received_at")
+
+    def __init__(self, title: str, source: str, text: str, link: str = "", labels=(),
+                 aired_on: str = "", received_at: int = 0):
+        self.title = title
+        self.source = source
+        self.text = text
+        self.link = link
+        self.labels = tuple(labels)
+        self.aired_on = aired_on  # ISO date of an earlier episode covering this story
+        self.received_at = received_at  # Gmail internalDate (ms since epoch), 0 if unknown
+
+    def get(self, key: str, default=None):
+        """Dict-style access for callers that still treat items as dicts."""
+        if key in self.__slots__:
+            value = getattr(self, key)
+            return value if value is not None else default
+        return default
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def to_dict(self) -> dict:
+        d = {k: getattr(self, k) for k in self.__slots__}
+        d["labels"] = list(self.labels)
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Item":
+        return cls(
+            title=d.get("title") or "",
+            source=d.get("source") or "",
+            text=d.get("text") or "",
+            link=d.get("link") or "",
+            labels=d.get("labels") or (),
+            aired_on=d.get("aired_on") or "",
+            received_at=int(d.get("received_at") or 0),
+        )
+
+    def __repr__(self) -> str:
+        return f"Item({self.title!r}, source={self.source!r}, {len(self.text)} chars)"
+
+
+class ItemView:
+    """Lazy filtered view over an ItemSpool (re-reads the file on each pass)."""
+
+    def __init__(self, source: Iterable[Item], predicate: Callable[[Item], bool]):
+        self._source = source
+        self._predicate = predicate
+        self._len: Optional[int] = None
+
+    def __iter__(self) -> Iterator[Item]:
+        return (it for it in self._source if self._predicate(it))
+
+    def __len__(self) -> int:
+        if self._len is None:
+            self._len = sum(1 for _ in self)
+        return self._len
+
+    def pick(self, order: List[int]) -> "PickedView":
+        """Items at positions `order` of this view, in that order (see ItemSpool.pick)."""
+        positions = [i for i, it in enumerate(self._source) if self._predicate(it)]
+        return self._source.pick([positions[j] for j in order])
+
+
+class PickedView:
+    """Lazy view of chosen ItemSpool items in a given order (one seek per item)."""
+
+    def __init__(self, spool: "ItemSpool", order: List[int]):
+        self._spool = spool
+        self._order = list(order)
+
+    def __iter__(self) -> Iterator[Item]:
+        return self._spool._read_at(self._order)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+class ItemSpool:
+    """
+    Append-only JSONL store of items. Iteration streams from disk, one item
+    at a time, and can be repeated (each pass re-opens the file).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.path, "w", encoding="utf-8", newline="\n")
+        self._offsets: List[int] = []  # byte offset of each line, for pick()
+        self._end = 0
+
+    def append(self, item: Item) -> None:
+        line = json.dumps(item.to_dict(), ensure_ascii=False) + "\n"
+        self._fh.write(line)
+        self._offsets.append(self._end)
+        self._end += len(line.encode("utf-8"))
+
+    def close(self) -> None:
+        if not self._fh.closed:
+            self._fh.close()
+
+    def __iter__(self) -> Iterator[Item]:
+        self._fh.flush()
+        with open(self.path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    yield Item.from_dict(json.loads(line))
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def select(self, predicate: Callable[[Item], bool]) -> ItemView:
+        return ItemView(self, predicate)
+
+    def pick(self, order: List[int]) -> PickedView:
+        """Items at positions `order`, in that order, without loading the rest."""
+        return PickedView(self, order)
+
+    def _read_at(self, order: List[int]) -> Iterator[Item]:
+        self._fh.flush()
+        with open(self.path, "rb") as fh:
+            for i in order:
+                fh.seek(self._offsets[i])
+                yield Item.from_dict(json.loads(fh.readline()))
+
+
+def select_items(items, predicate: Callable[[Item], bool]):
+    """Filter a list eagerly, or an ItemSpool lazily."""
+    if isinstance(items, ItemSpool):
+        return items.select(predicate)
+    return [it for it in items if predicate(it)]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB (0.0 where unsupported)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
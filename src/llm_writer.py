@@ -1,5 +1,7 @@
 # src/llm_writer.py
+import io
 import os
+import re
 import sys
 from typing import List, Dict
 
@@ -66,27 +68,34 @@ def _provider_call(system_instructions: str, user_message: str) -> str:
 
 # ------------------ Formatting ------------------
 
-def _bulletize_items(items: List[Dict], prefer_full_text: bool) -> str:
+_WS = re.compile(r"\s+")
+
+def _write_bullets(buf: io.StringIO, items: List[Dict], prefer_full_text: bool) -> None:
     """
-    Turn ALL items into a single, long bullet list with FULL text.
+    Write ALL items into `buf` as one long bullet list with FULL text.
     No truncation, no caps, no batching. (Mind your model's context window!)
+    Items are streamed one at a time, so an ItemSpool is never materialized.
     """
-    bullets = []
+    buf.write("Corpus of newsletter-derived items (full text, untrimmed):\n")
+    first = True
     for it in items:
         title = (it.get("title") or "Untitled").strip()
         src = (it.get("source") or "Unknown source").strip()
         body = (it.get("text") if prefer_full_text else (it.get("summary") or it.get("text") or "")).strip()
+        if not first:
+            buf.write("\n")
+        first = False
         # collapse excessive whitespace but keep everything
-        body = " ".join(body.split())
-        bullets.append(f"- {title} — Source: {src}. {body}")
-    return "Corpus of newsletter-derived items (full text, untrimmed):\n" + "\n".join(bullets)
+        buf.write(f"- {title} — Source: {src}. ")
+        if it.get("aired_on"):
+            buf.write(f"[Already covered on {it.get('aired_on')}: mention only genuinely new developments.] ")
+        buf.write(_WS.sub(" ", body))
 
-def _build_user_message(user_prompt: str, bullets_block: str, language: str) -> str:
+def _message_header(user_prompt: str, language: str) -> str:
     lang_name = "English" if language.startswith("en") else language
     return (
         f"LANGUAGE: {lang_name}\n"
         f"STYLE GOAL (from user): {user_prompt}\n\n"
-        + bullets_block
     )
 
 # ------------------ Public entry ------------------
@@ -105,8 +114,12 @@ def generate_script_from_prompt(
     WARNING: If the combined prompt exceeds your model's context window,
              the provider will error or drop content. Use at your own risk.
     """
-    bullets_block = _bulletize_items(items, prefer_full_text=prefer_full_text)
-    user_msg = _build_user_message(user_prompt, bullets_block, language)
+    # Header and bullets go into one buffer: a single copy of the corpus text
+    buf = io.StringIO()
+    buf.write(_message_header(user_prompt, language))
+    _write_bullets(buf, items, prefer_full_text=prefer_full_text)
+    user_msg = buf.getvalue()
+    del buf
     # 🔍 DEBUG LOG
     #print("\n[debug] ===== LLM SYSTEM INSTRUCTIONS =====", file=sys.stderr)
     #print(system_instructions, file=sys.stderr)
@@ -7,22 +7,12 @@ import time
 from pathlib import Path
 from html import escape
 
-from src.gmail_fetch import (
-    gmail_service,
-    list_messages,
-    get_message,
-    extract_email_html,
-    guess_source,
-)
-from src.cleaner import (
-    strip_html,
-    fetch_and_readable,
-    hash_key,
-    extract_links_from_html,  # ensure this exists; if not, remove this import
-)
-from src.tts import synthesize_paragraphs
-from src.audio import ffmpeg_join_and_normalize, make_silence_wav
-from src.llm_writer import generate_script_from_prompt  # prompt-oriented LLM script
+from src.items import peak_rss_mb
+from src import profiling
+
+# Heavy dependencies (googleapiclient, google-auth, bs4/lxml, requests, LLM SDKs)
+# are imported inside the stage that needs them, so `--resume` and `--dry_run`
+# only pay for what they actually run. See tools/import_time_check.py.
 
 OUT_DIR = Path("output")
 
@@ -45,57 +35,157 @@ def parse_since(s: str) -> int:
     return int(m.group(1)) if m else 1
 
 
-def build_items(gmail_label: str, since_days: int):
-    """
-    Build a list of items directly from Gmail newsletters only.
-    No link expansion – just use the email subject + body text.
-    """
-    items = []
-    svc = gmail_service(
+def _gmail_client():
+    from src.gmail_fetch import gmail_service
+    return gmail_service(
         os.getenv("GMAIL_CLIENT_ID"),
         os.getenv("GMAIL_CLIENT_SECRET"),
         os.getenv("GMAIL_REFRESH_TOKEN"),
     )
-    msgs = list_messages(svc, gmail_label, since_days=since_days)
-    log(f"Gmail returned {len(msgs)} messages for label={gmail_label} in last {since_days}d")
-
-    for idx, m in enumerate(msgs, 1):
-        log(f"[{idx}/{len(msgs)}] Fetching message …")
-        full = get_message(svc, m["id"])
-        headers = full.get("payload", {}).get("headers", [])
-        newsletter = (guess_source(headers) or "Newsletter").strip()
-        html = extract_email_html(full)
-        text = strip_html(html)
-        title = next(
-            (h["value"] for h in headers if h.get("name", "").lower() == "subject"),
-            "",
-        ) or "Untitled"
-        if text.strip():
-            items.append(
-                {
-                    "title": title.strip(),
-                    "text": text.strip(),
-                    "source": newsletter,
-                    "link": "",  # no external links anymore
-                }
-            )
-            log(f"[{idx}/{len(msgs)}] {newsletter}: added email body as item")
 
-    log(f"Collected {len(items)} raw items")
-    # Deduplicate by title+source hash
-    seen, dedup = set(), []
-    for it in items:
-        h = hash_key((it.get("title") or "") + (it.get("source") or ""))
+
+def list_label_messages(svc, labels, since_days: int, before=None):
+    """message id -> labels it was listed under (insertion order = Gmail order)."""
+    from src.gmail_fetch import list_messages
+
+    msg_labels = {}
+    for label in labels:
+        msgs = list_messages(svc, label, since_days=since_days, before=before)
+        log(f"Gmail returned {len(msgs)} messages for label={label} in last {since_days}d")
+        for m in msgs:
+            msg_labels.setdefault(m["id"], []).append(label)
+    if len(labels) > 1:
+        log(f"{len(msg_labels)} unique messages across {len(labels)} labels")
+    return msg_labels
+
+
+def fetch_clean_message(svc, msg_id: str, labels):
+    """
+    Fetch one message and clean it into an Item.
+    Returns (item or None if the body is empty, received_at ms, payload bytes).
+    """
+    from src.gmail_fetch import get_message, extract_email_html, guess_source, payload_bytes
+    from src.cleaner import strip_html
+    from src.items import Item
+
+    full = get_message(svc, msg_id)
+    size = payload_bytes(full)
+    received_at = int(full.get("internalDate") or 0)
+    headers = full.get("payload", {}).get("headers", [])
+    newsletter = (guess_source(headers) or "Newsletter").strip()
+    with profiling.timed("cleaning"):
+        text = strip_html(extract_email_html(full)).strip()
+    del full
+    title = (next(
+        (h["value"] for h in headers if h.get("name", "").lower() == "subject"),
+        "",
+    ) or "Untitled").strip()
+    if not text:
+        return None, received_at, size
+    return (Item(title=title, source=newsletter, text=text, labels=labels, received_at=received_at),
+            received_at, size)
+
+
+def _fetch_items(svc, msg_labels, archive=None):
+    """
+    Yield cleaned Items for `msg_labels`, one message in memory at a time.
+    Each cleaned message is also written to `archive` (an ItemStore) if given.
+    """
+    fetched, total = 0, len(msg_labels)
+    for idx, (msg_id, msg_label_list) in enumerate(msg_labels.items(), 1):
+        log(f"[{idx}/{total}] Fetching message …")
+        item, received_at, size = fetch_clean_message(svc, msg_id, msg_label_list)
+        fetched += size
+        if archive is not None:
+            archive.put(msg_id, received_at, msg_label_list,
+                        item.title if item else "", item.source if item else "", item.text if item else "")
+        if item is not None:
+            log(f"[{idx}/{total}] {item.source}: added email body as item")
+            yield item
+    if total:
+        log(f"Gmail payloads: {fetched / 1024:.0f} KiB for {total} messages "
+            f"(avg {fetched / total / 1024:.1f} KiB)")
+
+
+def admit_items(candidates, sink=None, story_index=None,
+                aired_days: int = 0, aired_policy: str = "drop"):
+    """
+    De-duplicate `candidates` by title+source and append them to `sink`
+    (a list by default, or an ItemSpool).
+    With a `story_index` and `aired_days` > 0, items matching a story aired in
+    that window are dropped or (aired_policy="flag") marked with Item.aired_on.
+    """
+    from src.cleaner import hash_key
+
+    if sink is None:
+        sink = []
+    raw, seen, aired = 0, set(), 0
+    for item in candidates:
+        raw += 1
+        # Deduplicate by title+source hash
+        h = hash_key(item.title + item.source)
         if h in seen:
             continue
         seen.add(h)
-        dedup.append(it)
-    log(f"De-duplicated to {len(dedup)} items")
-    return dedup
+        if story_index is not None and aired_days > 0:
+            hit = story_index.find_aired(item.title, item.text, aired_days)
+            if hit:
+                aired += 1
+                if aired_policy == "drop":
+                    log(f"{item.source}: skipped, aired {hit['aired_on']} ({hit['match']})")
+                    continue
+                item.aired_on = hit["aired_on"]
+        sink.append(item)
+
+    log(f"Collected {raw} raw items")
+    if aired:
+        verb = "Dropped" if aired_policy == "drop" else "Flagged"
+        log(f"{verb} {aired} items already aired in the last {aired_days}d")
+    log(f"De-duplicated to {len(sink)} items")
+    return sink
+
+
+def collect_items(svc, labels, since_days: int, sink=None, story_index=None,
+                  aired_days: int = 0, aired_policy: str = "drop", archive=None):
+    """
+    Fetch, clean and de-duplicate the union of messages under `labels`.
+    Each message is fetched and cleaned exactly once, even when it carries
+    several labels; Item.labels lists which ones matched.
+    Items are appended to `sink` as they are produced, so only one message
+    body is held at a time. See admit_items for the aired-story filter.
+    `archive` (an ItemStore) keeps every cleaned message for later recaps.
+    """
+    msg_labels = list_label_messages(svc, labels, since_days)
+    return admit_items(_fetch_items(svc, msg_labels, archive), sink=sink, story_index=story_index,
+                       aired_days=aired_days, aired_policy=aired_policy)
 
 
-def write_notes_html(items, script_text=None):
-    OUT_DIR.mkdir(parents=True, exist_ok=True)
+def store_items(store, labels, since_days: int, sink=None, story_index=None,
+                aired_days: int = 0, aired_policy: str = "drop"):
+    """Same as collect_items, but read from the local ingest store (no network)."""
+    since_ms = int((time.time() - since_days * 86400) * 1000)
+    log(f"Reading items from store {store.path} ({len(store)} messages) for last {since_days}d")
+    return admit_items(store.items(since_ms, labels=labels), sink=sink, story_index=story_index,
+                       aired_days=aired_days, aired_policy=aired_policy)
+
+
+def build_items(gmail_label: str, since_days: int, svc=None, sink=None, story_index=None,
+                aired_days: int = 0, aired_policy: str = "drop", archive=None):
+    """
+    Build a list of items directly from Gmail newsletters only.
+    No link expansion – just use the email subject + body text.
+    `svc` overrides the Gmail client (used by tools/bench_pipeline.py);
+    `sink` may be an ItemSpool to keep items on disk instead of in memory;
+    `archive` (an ItemStore) persists every cleaned message.
+    """
+    if svc is None:
+        svc = _gmail_client()
+    return collect_items(svc, [gmail_label], since_days, sink=sink, story_index=story_index,
+                         aired_days=aired_days, aired_policy=aired_policy, archive=archive)
+
+
+def write_notes_html(items, script_text=None, out_dir: Path = OUT_DIR):
+    out_dir.mkdir(parents=True, exist_ok=True)
 
     # First non-empty line of the script as overview
     overview = ""
@@ -126,7 +216,7 @@ def write_notes_html(items, script_text=None):
     html.append("<p>🎧 This episode was generated with AI from fintech newsletters.</p>")
     html.append("</div>")
 
-    (OUT_DIR / "notes.html").write_text("\n".join(html), encoding="utf-8")
+    (out_dir / "notes.html").write_text("\n".join(html), encoding="utf-8")
 
 
 def split_script_into_blocks(script: str):
@@ -136,15 +226,559 @@ def split_script_into_blocks(script: str):
     return [b.strip() for b in script.split("\n\n") if b.strip()]
 
 
+def rank_stage(items, topics_file, args):
+    """Order (and optionally trim) items by relevance to the topic profile."""
+    if not topics_file:
+        return items
+    from src.ranker import load_profile, rank_items
+
+    t = time.time()
+    profile = load_profile(topics_file)
+    with profiling.stage("rank_items"):
+        ranked, scores = rank_items(
+            items, profile,
+            min_score=args.min_relevance,
+            max_items=args.max_items,
+            drop=args.drop_irrelevant,
+        )
+    log(f"Ranked {len(scores)} items against {len(profile)} topic terms in "
+        f"{(time.time() - t) * 1000:.0f} ms → {len(ranked)} kept")
+    return ranked
+
+
+def build_script(items, prompt_file=None, language: str = "en-US", llm_full_text: bool = False,
+                 fallback_words: int = 1500):
+    """
+    LLM-driven (prompt) script if configured, else a bounded extractive summary.
+    Returns (script, sources): for each paragraph, the positions in `items`
+    it covers, or sources=None for an LLM script, which saw every item.
+    """
+    script = None
+    if prompt_file:
+        try:
+            user_prompt = Path(prompt_file).read_text(encoding="utf-8").strip()
+            if user_prompt:
+                from src.llm_writer import generate_script_from_prompt
+                log("Calling LLM to draft script …")
+                with profiling.stage("generate_script_from_prompt"):
+                    script = generate_script_from_prompt(
+                        items,
+                        user_prompt=user_prompt,
+                        language=language,
+                        prefer_full_text=llm_full_text,
+                    )
+                log("LLM finished script.")
+        except Exception as e:
+            print(f"[warn] LLM script generation failed: {e}. Falling back to local builder.", file=sys.stderr)
+    if script:
+        return script, None
+
+    from src.extractive import build_extractive
+
+    t = time.time()
+    with profiling.stage("extractive_script"):
+        script, sources = build_extractive(items, word_budget=fallback_words)
+    log(f"Extractive fallback script: {len(script.split())} words "
+        f"(budget {fallback_words}) in {(time.time() - t) * 1000:.0f} ms")
+    return script, sources
+
+
+def plan_stage(script: str, sources, items, voice: str, *, pause_ms: int, length_scale: float,
+               sentence_silence_ms: int, target_minutes: float, calibration: str):
+    """
+    Predict spoken length before TTS; trim to --target_minutes if set.
+    Returns (script, positions in `items` still covered by it, or None for all).
+    """
+    from src.planner import load_calibration, plan_script
+    from src.timing import format_duration
+
+    cal = load_calibration(calibration, voice or "", length_scale)
+    planned, report = plan_script(
+        script, cal,
+        pause_seconds=max(0, pause_ms) / 1000.0,
+        sentence_silence_ms=sentence_silence_ms,
+        target_seconds=target_minutes * 60,
+    )
+    msg = f"Predicted episode length {format_duration(report['predicted'])}"
+    if report["dropped"]:
+        msg += (f" (trimmed {report['dropped']} paragraphs from "
+                f"{format_duration(report['original'])} to fit {target_minutes:g} min)")
+    log(msg + f" [calibrated over {cal['runs']} runs]")
+    if sources is not None:
+        return planned, sorted({pos for i in report["kept"] for pos in sources[i]})
+    if not report["dropped"]:
+        return planned, None
+
+    # LLM script: every item it saw counts as covered, except those whose
+    # matched paragraphs were all trimmed (one newsletter feeds many paragraphs).
+    from src.text import match_paragraphs
+
+    kept = set(report["kept"])
+    matched = {}
+    for i, positions in enumerate(match_paragraphs(split_script_into_blocks(script), items)):
+        for pos in positions:
+            matched[pos] = matched.get(pos, False) or i in kept
+    lost = {pos for pos, survives in matched.items() if not survives}
+    log(f"{len(lost)} items lost all their paragraphs to trimming")
+    return planned, [pos for pos in range(len(items)) if pos not in lost]
+
+
+def covered_items(items, positions):
+    """The items at `positions` (ascending; None = all), streaming `items` once."""
+    if positions is None:
+        return items
+    wanted = set(positions)
+    return [it for pos, it in enumerate(items) if pos in wanted]
+
+
+def render_audio(script: str, out_dir: Path, piper: str, voice: str, *,
+                 pause_ms: int, length_scale: float, sentence_silence_ms: int,
+                 renditions: str = "", calibration: str = "", segment_encode: bool = False) -> Path:
+    """
+    TTS → wav parts with pauses → normalized episode.mp3 (+ extra renditions) in out_dir.
+    With `segment_encode`, parts are encoded in parallel while TTS runs and
+    the episode is a lossless concat of them (see audio.SegmentEncoder).
+    """
+    from src.tts import synthesize_paragraphs
+    from src.audio import ffmpeg_join_and_normalize, parse_renditions, rendition_paths, SegmentEncoder
+    from src.timing import load_manifest, chapters_from_manifest, format_duration, set_encoded_duration
+
+    mp3 = out_dir / "episode.mp3"
+    specs = parse_renditions(renditions)
+    encoder = SegmentEncoder(out_dir, specs) if segment_encode else None
+
+    log("Synthesizing TTS (Piper) per paragraph" + (", encoding segments as they finish …" if encoder else " …"))
+    try:
+        with profiling.stage("synthesize_paragraphs"):
+            wav_paths = synthesize_paragraphs(
+                script,
+                out_dir,
+                piper,
+                voice,
+                pause_seconds=max(0, pause_ms) / 1000.0,
+                length_scale=length_scale,
+                sentence_silence_ms=sentence_silence_ms,
+                on_segment=encoder.submit if encoder else None,
+            )
+    except BaseException:
+        if encoder:
+            encoder.close()
+        raise
+    manifest = load_manifest(out_dir)
+    chapters = chapters_from_manifest(manifest)
+    if manifest:
+        log(f"Episode length {format_duration(manifest['duration'])} ({len(chapters)} chapters)")
+        if calibration:
+            from src.planner import calibrate
+            predicted, actual = calibrate(calibration, voice, length_scale, script, manifest,
+                                          sentence_silence_ms)
+            if actual:
+                log(f"Speech predicted {predicted:.0f}s, measured {actual:.0f}s "
+                    f"({(predicted - actual) / actual:+.0%}); calibration updated")
+    formats = ", ".join(r["ext"] + "@" + r["bitrate"] for r in specs)
+    if encoder:
+        log(f"Joining encoded segments → {formats} (gain {encoder.gain_db or 0:+.1f} dB) …")
+        with profiling.stage("segment_concat"):
+            encoder.finish(mp3, manifest)
+        set_encoded_duration(out_dir, encoder.duration)
+        log(f"Joined episode length {format_duration(encoder.duration)} (encoder padding included)")
+    else:
+        log(f"Normalizing & encoding → {formats} …")
+        with profiling.stage("ffmpeg_join_and_normalize"):
+            ffmpeg_join_and_normalize(wav_paths, mp3, chapters=chapters, renditions=specs)
+    for path in rendition_paths(mp3, specs):
+        log(f"Encoded: {path} ({path.stat().st_size // 1024} KiB)")
+    return mp3
+
+
+def _item_sink(args):
+    """ItemSpool under output/ when --spool is set, else a plain list."""
+    if not args.spool:
+        return None
+    from src.items import ItemSpool
+    spool = ItemSpool(OUT_DIR / "items.jsonl")
+    log(f"Spooling items to {spool.path}")
+    return spool
+
+
+def _story_index(args):
+    """StoryIndex at --story_index when --skip_aired_days is set, else None."""
+    if args.skip_aired_days <= 0:
+        return None
+    from src.story_index import StoryIndex
+    index = StoryIndex(args.story_index)
+    log(f"Story index {args.story_index}: {len(index)} aired stories")
+    return index
+
+
+def record_aired(index, items) -> None:
+    """Remember the stories an episode covered so later episodes can skip them."""
+    if index is None:
+        return
+    n = index.add(it for it in items if not it.get("aired_on"))
+    log(f"Recorded {n} stories in the story index")
+
+
+# ---------------- Ingest mode ----------------
+def ingest_once(svc, store, labels, since_days: int) -> int:
+    """Fetch + clean messages not yet in `store`. Returns how many were added."""
+    msg_labels = list_label_messages(svc, labels, since_days)
+    known = store.known_ids(msg_labels)
+    added = 0
+    for msg_id, msg_label_list in msg_labels.items():
+        if msg_id in known:
+            if len(labels) > 1:
+                store.add_labels(msg_id, msg_label_list)
+            continue
+        item, received_at, _ = fetch_clean_message(svc, msg_id, msg_label_list)
+        # Empty bodies are stored too, so they are not fetched again next poll
+        store.put(msg_id, received_at, msg_label_list,
+                  item.title if item else "", item.source if item else "", item.text if item else "")
+        added += 1
+        if item is not None:
+            log(f"[ingest] {item.source}: {item.title}")
+    return added
+
+
+def _start_push_listener(port: int, wake):
+    """
+    Local stand-in for Gmail push (Pub/Sub) notifications: any POST to
+    http://127.0.0.1:<port>/ wakes the ingest loop immediately.
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            wake.set()
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *a):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    log(f"[ingest] push listener on http://127.0.0.1:{server.server_port}/")
+    return server
+
+
+def run_ingest(labels, args) -> None:
+    """
+    Long-running ingest: poll Gmail every --poll_seconds (or on a push
+    notification), and fetch, clean and store new messages so the scheduled
+    build (--from_store) only has to write, synthesize and encode.
+    """
+    import threading
+    from src.store import ItemStore
+
+    store = ItemStore(args.store)
+    svc = _gmail_client()
+    days = parse_since(args.since)
+    wake = threading.Event()
+    if args.push_port:
+        _start_push_listener(args.push_port, wake)
+    log(f"[ingest] labels={', '.join(labels)} store={args.store} ({len(store)} messages)")
+
+    while True:
+        t = time.time()
+        try:
+            added = ingest_once(svc, store, labels, days)
+            log(f"[ingest] +{added} messages in {time.time() - t:.1f}s (store: {len(store)})")
+        except Exception as e:
+            print(f"[warn] ingest poll failed: {e}", file=sys.stderr)
+        if args.poll_seconds <= 0:
+            return
+        wake.wait(args.poll_seconds)
+        wake.clear()
+
+
+def _open_store(args):
+    from src.store import ItemStore
+    return ItemStore(args.store)
+
+
+def _archive(args):
+    """The --store archive that regular builds write cleaned messages to, or None."""
+    if args.no_archive or args.from_store:
+        return None
+    return _open_store(args)
+
+
+# ---------------- Multi-show mode ----------------
+def show_config(raw, args):
+    """One show's settings: "name" and "label" are required, the rest default to the CLI flags."""
+    name = raw["name"]
+    return {
+        "name": name,
+        "label": raw["label"],
+        "prompt_file": raw.get("prompt_file", args.prompt_file),
+        "language": raw.get("language", os.getenv("PODCAST_LANG", "en-US")),
+        "topics": raw.get("topics", args.topics),
+        "voice": raw.get("voice", args.voice),
+        "out_dir": Path(raw.get("out_dir", OUT_DIR / name)),
+        "llm_full_text": raw.get("llm_full_text", args.llm_full_text),
+        "fallback_words": raw.get("fallback_words", args.fallback_words),
+        "target_minutes": raw.get("target_minutes", args.target_minutes),
+        "pause_ms": raw.get("pause_ms", args.pause_ms),
+        "length_scale": raw.get("length_scale", args.length_scale),
+        "sentence_silence_ms": raw.get("sentence_silence_ms", args.sentence_silence_ms),
+    }
+
+
+def _read_shows(path: str):
+    """The raw show entries of a shows config (JSON)."""
+    import json
+
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return data.get("shows", []) if isinstance(data, dict) else data
+
+
+def show_labels(path: str):
+    """The labels of a shows config, deduplicated (all --ingest needs; no voices required)."""
+    return list(dict.fromkeys(raw["label"] for raw in _read_shows(path)))
+
+
+def load_shows(path: str, args):
+    """
+    Read a shows config (JSON). Each show needs "name" and "label"; every other
+    key falls back to the matching CLI flag. See shows.example.json.
+    """
+    shows = [show_config(raw, args) for raw in _read_shows(path)]
+    for sh in shows:
+        if not sh["voice"] and not args.dry_run:
+            raise SystemExit(f"show {sh['name']!r} has no voice (set \"voice\" or --voice)")
+    return shows
+
+
+def run_show(show, items, args):
+    """Build one show; returns the items its final script covers."""
+    with profiling.scope(show["name"]):
+        return _run_show(show, items, args)
+
+
+def _run_show(show, items, args):
+    from src.items import select_items
+
+    out_dir = show["out_dir"]
+    out_dir.mkdir(parents=True, exist_ok=True)
+    show_items = select_items(items, lambda it: show["label"] in it.labels)
+    show_items = rank_stage(show_items, show["topics"], args)
+    log(f"[{show['name']}] {len(show_items)} items")
+
+    script, sources = build_script(show_items, show["prompt_file"], show["language"],
+                                   show["llm_full_text"], show["fallback_words"])
+    script, covered = plan_stage(
+        script, sources, show_items, show["voice"],
+        pause_ms=show["pause_ms"],
+        length_scale=show["length_scale"],
+        sentence_silence_ms=show["sentence_silence_ms"],
+        target_minutes=show["target_minutes"],
+        calibration=args.tts_calibration,
+    )
+    show_items = covered_items(show_items, covered)
+    (out_dir / "script.md").write_text(script, encoding="utf-8")
+    write_notes_html(show_items, script, out_dir=out_dir)
+    log(f"[{show['name']}] Wrote script.md ({len(script)} chars) and notes.html "
+        f"({len(show_items)} stories covered)")
+    if args.dry_run:
+        return show_items
+
+    render_audio(
+        script, out_dir, args.piper, show["voice"],
+        pause_ms=show["pause_ms"],
+        length_scale=show["length_scale"],
+        sentence_silence_ms=show["sentence_silence_ms"],
+        renditions=args.renditions,
+        calibration=args.tts_calibration,
+        segment_encode=args.segment_encode,
+    )
+    return show_items
+
+
+def run_parallel(shows, items_for, args, workers: int, kind: str = "show", on_done=None) -> None:
+    """
+    run_show for every show on a thread pool (script generation waits on the
+    LLM and audio on piper/ffmpeg subprocesses, so threads are enough), with
+    `items_for(show)` as its items. `on_done(show, covered)` runs for each
+    show that succeeded; exits 1 after all finish if any failed.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [(sh, pool.submit(run_show, sh, items_for(sh), args)) for sh in shows]
+        failed = []
+        for sh, fut in futures:
+            try:
+                covered = fut.result()
+            except Exception as e:
+                print(f"[warn] {kind} {sh['name']} failed: {e}", file=sys.stderr)
+                failed.append(sh["name"])
+                continue
+            log(f"[{sh['name']}] done")
+            if on_done:
+                on_done(sh, covered)
+    log(f"Peak RSS {peak_rss_mb():.0f} MiB")
+    if failed:
+        sys.exit(1)
+
+
+def run_shows(shows_path: str, args) -> None:
+    """
+    Fetch the union of all show labels once, clean each message once, then
+    build every show's script and audio in parallel from the shared items.
+    """
+    shows = load_shows(shows_path, args)
+    labels = list(dict.fromkeys(sh["label"] for sh in shows))
+    log(f"Multi-show mode: {len(shows)} shows over labels {', '.join(labels)}")
+
+    index = _story_index(args)
+    gather_opts = dict(sink=_item_sink(args), story_index=index,
+                       aired_days=args.skip_aired_days, aired_policy=args.aired_policy)
+    with profiling.stage("build_items"):
+        if args.from_store:
+            items = store_items(_open_store(args), labels, parse_since(args.since), **gather_opts)
+        else:
+            items = collect_items(_gmail_client(), labels, parse_since(args.since),
+                                  archive=_archive(args), **gather_opts)
+
+    # Only what each built episode actually aired, recorded per show
+    aired = None if args.dry_run else (lambda sh, covered: record_aired(index, covered))
+    run_parallel(shows, lambda sh: items, args, workers=len(shows), on_done=aired)
+    log("All shows done ✅")
+
+
+# ---------------- Backfill mode ----------------
+def parse_backfill(spec: str):
+    """'2025-09-20:2025-09-26' (inclusive) → (start date, end date)."""
+    from datetime import date
+
+    start_s, _, end_s = spec.partition(":")
+    start = date.fromisoformat(start_s.strip())
+    end = date.fromisoformat((end_s or start_s).strip())
+    if end < start:
+        raise ValueError(f"backfill range ends before it starts: {spec}")
+    return start, end
+
+
+def partition_by_day(items, start, end):
+    """{date: [items]} for every day in [start, end] (UTC, by Item.received_at)."""
+    from datetime import datetime, timedelta, timezone
+
+    days = {start + timedelta(days=i): [] for i in range((end - start).days + 1)}
+    for it in items:
+        if not it.received_at:
+            continue
+        day = datetime.fromtimestamp(it.received_at / 1000, tz=timezone.utc).date()
+        if day in days:
+            days[day].append(it)
+    return days
+
+
+def backfill_items(start, end, label: str, args, svc=None):
+    """Every message in the range, listed and cleaned once, split by day and de-duplicated per day."""
+    from datetime import date, datetime, time as dtime, timedelta, timezone
+
+    if args.from_store:
+        since_ms = int(datetime.combine(start, dtime(), tzinfo=timezone.utc).timestamp() * 1000)
+        until_ms = int(datetime.combine(end + timedelta(days=1), dtime(), tzinfo=timezone.utc).timestamp() * 1000)
+        raw = list(_open_store(args).items(since_ms, until_ms, labels=[label]))
+    else:
+        svc = svc or _gmail_client()
+        # Gmail's after:/before: are day-granular in the mailbox's timezone, so
+        # list a day wider on each side and split on internalDate below.
+        since_days = (date.today() - start).days + 1
+        msg_labels = list_label_messages(svc, [label], since_days, before=end + timedelta(days=2))
+        raw = list(_fetch_items(svc, msg_labels, _archive(args)))
+
+    by_day = partition_by_day(raw, start, end)
+    for day, day_items in by_day.items():
+        log(f"[{day}] {len(day_items)} messages")
+        by_day[day] = admit_items(day_items)
+    return by_day
+
+
+def run_backfill(spec: str, args, svc=None) -> None:
+    """
+    Rebuild missed days: fetch the covering window once, then build each
+    day's script and audio in parallel into output/backfill/<date>/.
+    Publish with `python -m src.feed --backfill output/backfill`.
+    """
+    start, end = parse_backfill(spec)
+    label = os.getenv("GMAIL_LABEL", "Newsletters")
+    log(f"Backfill {start} → {end} for label={label}")
+    with profiling.stage("build_items"):
+        by_day = backfill_items(start, end, label, args, svc=svc)
+
+    shows, day_items = [], {}
+    for day, items in by_day.items():
+        if not items:
+            log(f"[{day}] no items, skipping")
+            continue
+        show = show_config({"name": day.isoformat(), "label": label,
+                            "out_dir": OUT_DIR / "backfill" / day.isoformat()}, args)
+        shows.append(show)
+        day_items[show["name"]] = items
+
+    # Days are independent; their piper/ffmpeg subprocesses run side by side.
+    run_parallel(shows, lambda sh: day_items[sh["name"]], args,
+                 workers=min(len(shows), args.jobs or os.cpu_count() or 1), kind="backfill day")
+    log(f"Backfilled {len(shows)} days ✅")
+
+
+# ---------------- Recap mode ----------------
+def recap_items(store, label: str, since_days: int, query=None, source=None):
+    """Archived items for a recap window (no network), syndicated copies collapsed."""
+    t = time.time()
+    since_ms = int((time.time() - since_days * 86400) * 1000)
+    items = admit_items(store.items(since_ms, labels=[label], source=source, query=query, distinct=True))
+    log(f"Recap corpus: {len(items)} items from the last {since_days}d of {store.path} "
+        f"({len(store)} archived) in {(time.time() - t) * 1000:.0f} ms")
+    return items
+
+
+def run_recap(args) -> None:
+    """Build a recap episode for the --recap window from the archive into output/recap/."""
+    label = os.getenv("GMAIL_LABEL", "Newsletters")
+    days = parse_since(args.recap)
+    filters = ", ".join(f for f in (args.recap_query and f"query={args.recap_query!r}",
+                                    args.recap_source and f"source~{args.recap_source!r}") if f)
+    log(f"Recap of the last {days}d for label={label}" + (f" ({filters})" if filters else ""))
+    with profiling.stage("build_items"):
+        items = recap_items(_open_store(args), label, days,
+                            query=args.recap_query, source=args.recap_source)
+    if not items:
+        log("No archived items match; nothing to build.")
+        return
+    show = show_config({"name": "recap", "label": label, "out_dir": OUT_DIR / "recap"}, args)
+    run_show(show, items, args)
+    log(f"Recap written to {show['out_dir']} ✅")
+# --------------------------------------------------
+
+
 def main():
     ap = argparse.ArgumentParser(description="Build daily fintech podcast from Gmail newsletters.")
     ap.add_argument("--since", default="1d", help="How far back to fetch (e.g., 1d, 7d).")
-    ap.add_argument("--piper", required=True, help="Path to piper binary (e.g., `which piper`).")
-    ap.add_argument("--voice", required=True, help="Path to a Piper .onnx voice model.")
+    ap.add_argument("--piper", default=None,
+                    help="Path to piper binary (e.g., `which piper`). Required unless --dry_run/--ingest.")
+    ap.add_argument("--voice", default=None,
+                    help="Path to a Piper .onnx voice model (required unless every show in --shows sets one).")
+    ap.add_argument("--shows", default=None,
+                    help="JSON config of several shows to build from one shared fetch (see shows.example.json).")
     ap.add_argument("--prompt_file", default=None, help="Text prompt to steer the LLM script.")
     ap.add_argument("--dry_run", action="store_true", help="Generate script/notes only (no audio).")
     ap.add_argument("--llm_full_text", action="store_true",
                     help="If set with --prompt_file, send full newsletter bodies to LLM (skip local summarization).")
+    ap.add_argument("--fallback_words", type=int, default=1500,
+                    help="Word budget for the extractive script used when no LLM script is available.")
+    ap.add_argument("--target_minutes", type=float, default=0,
+                    help="Trim the lowest-priority paragraphs before TTS so the episode fits (0 = no limit).")
+    ap.add_argument("--segment_encode", action="store_true",
+                    help="Encode each paragraph while TTS runs and join them losslessly "
+                         "(fixed gain + limiter instead of a final loudnorm pass).")
+    ap.add_argument("--tts_calibration", default="state/tts_calibration.json",
+                    help="Per-voice speaking-rate calibration, updated after every render.")
     ap.add_argument("--pause_ms", type=int, default=1200,
                     help="Silence (ms) between paragraphs.")
     ap.add_argument("--extra_pause_after_open_ms", type=int, default=600,
@@ -165,27 +799,112 @@ def main():
         default=200,              # small per-sentence break
         help="Extra silence (ms) Piper inserts after sentence boundaries.",
     )
+    ap.add_argument("--topics", default=None,
+                    help="Topic profile (e.g. prompts/topics.txt) used to rank items before the LLM.")
+    ap.add_argument("--min_relevance", type=float, default=0.0,
+                    help="Items scoring below this are demoted (or dropped with --drop_irrelevant).")
+    ap.add_argument("--drop_irrelevant", action="store_true",
+                    help="Drop items below --min_relevance instead of moving them to the end.")
+    ap.add_argument("--max_items", type=int, default=0,
+                    help="Keep only the N most relevant items (0 = all).")
+    ap.add_argument("--story_index", default="state/stories.db",
+                    help="SQLite index of stories aired in past episodes.")
+    ap.add_argument("--skip_aired_days", type=int, default=0,
+                    help="Skip (or flag) items matching a story aired in the last N days (0 = off).")
+    ap.add_argument("--aired_policy", choices=["drop", "flag"], default="drop",
+                    help="What to do with already-aired items: drop them or flag them for the LLM.")
+    ap.add_argument("--spool", action="store_true",
+                    help="Keep fetched items in output/items.jsonl and stream them to later "
+                         "stages instead of holding them in memory (large --since windows).")
+    ap.add_argument(
+        "--renditions",
+        default="mp3:64k,opus:24k",
+        help="Comma-separated format:bitrate list encoded from one normalize pass. "
+             "The first must be mp3 and is published as episode.mp3.",
+    )
+    ap.add_argument("--ingest", action="store_true",
+                    help="Run the ingest daemon: poll Gmail and store cleaned messages in --store.")
+    ap.add_argument("--poll_seconds", type=int, default=300,
+                    help="Ingest poll interval (0 = ingest once and exit).")
+    ap.add_argument("--push_port", type=int, default=0,
+                    help="Also wake the ingest loop on any POST to this local port (push stand-in).")
+    ap.add_argument("--store", default="state/items.db",
+                    help="SQLite store/archive: written by --ingest and regular builds, "
+                         "read by --from_store and --recap.")
+    ap.add_argument("--from_store", action="store_true",
+                    help="Build from the local ingest store instead of fetching from Gmail.")
+    ap.add_argument("--backfill", default=None, metavar="START:END",
+                    help="Rebuild each day in an inclusive date range (YYYY-MM-DD:YYYY-MM-DD) "
+                         "into output/backfill/<date>/, in parallel.")
+    ap.add_argument("--jobs", type=int, default=0,
+                    help="Parallel days for --backfill (default: CPU count).")
+    ap.add_argument("--no_archive", action="store_true",
+                    help="Don't keep cleaned messages in the --store archive (used by --recap).")
+    ap.add_argument("--recap", default=None, metavar="WINDOW",
+                    help="Build a recap episode (e.g. 7d, 30d) from the archive into output/recap/, no network.")
+    ap.add_argument("--recap_query", default=None,
+                    help="With --recap: only items matching these words (full-text, all must match).")
+    ap.add_argument("--recap_source", default=None,
+                    help="With --recap: only items whose sender contains this text.")
+    ap.add_argument("--profile", action="store_true",
+                    help="Profile each stage (cProfile, tracemalloc, child process time) into output/profile/.")
     args = ap.parse_args()
 
+    if args.profile:
+        profiling.enable(OUT_DIR / "profile")
+        log(f"Profiling stages into {OUT_DIR / 'profile'}")
+
+    if args.ingest:
+        if args.shows:
+            labels = show_labels(args.shows)
+        else:
+            labels = [os.getenv("GMAIL_LABEL", "Newsletters")]
+        run_ingest(labels, args)
+        return
+    if not args.piper and not args.dry_run:
+        ap.error("--piper is required (unless --dry_run or --ingest)")
+
+    from src.audio import parse_renditions
+    try:
+        parse_renditions(args.renditions)
+    except ValueError as e:
+        ap.error(str(e))
+
+    if args.recap:
+        if not args.voice and not args.dry_run:
+            ap.error("--voice is required for --recap")
+        run_recap(args)
+        return
+    if args.backfill:
+        try:
+            parse_backfill(args.backfill)
+        except ValueError as e:
+            ap.error(f"--backfill: {e}")
+        if not args.voice and not args.dry_run:
+            ap.error("--voice is required for --backfill")
+        run_backfill(args.backfill, args)
+        return
+    if args.shows:
+        run_shows(args.shows, args)
+        return
+    if not args.voice:
+        ap.error("--voice is required (unless using --shows)")
+
+    audio_opts = dict(
+        pause_ms=args.pause_ms,
+        length_scale=args.length_scale,
+        sentence_silence_ms=args.sentence_silence_ms,
+        renditions=args.renditions,
+        calibration=args.tts_calibration,
+        segment_encode=args.segment_encode,
+    )
+
     # ---------- Fast path: resume from existing script ----------
     if args.resume:
         OUT_DIR.mkdir(parents=True, exist_ok=True)
         script = (OUT_DIR / "script.md").read_text(encoding="utf-8").strip()
         log(f"[resume] Using existing script ({len(script)} chars)")
-
-        wav_paths = synthesize_paragraphs(
-            script,
-            OUT_DIR,
-            args.piper,
-            args.voice,
-            pause_seconds=max(0, args.pause_ms) / 1000.0,
-            length_scale=args.length_scale,
-            sentence_silence_ms=args.sentence_silence_ms,
-        )
-        mp3 = OUT_DIR / "episode.mp3"
-        log("Normalizing & encoding → MP3 …")
-        ffmpeg_join_and_normalize(wav_paths, mp3)
-        log(f"MP3 done: {mp3}")
+        render_audio(script, OUT_DIR, args.piper, args.voice, **audio_opts)
         log("All done ✅")
         sys.exit(0)
     # -----------------------------------------------------------
@@ -195,7 +914,15 @@ def main():
     days = parse_since(args.since)
 
     # 1) Gather ALL items from Gmail
-    items = build_items(label, since_days=days)
+    index = _story_index(args)
+    with profiling.stage("build_items"):
+        if args.from_store:
+            items = store_items(_open_store(args), [label], days, sink=_item_sink(args), story_index=index,
+                                aired_days=args.skip_aired_days, aired_policy=args.aired_policy)
+        else:
+            items = build_items(label, since_days=days, sink=_item_sink(args), story_index=index,
+                                aired_days=args.skip_aired_days, aired_policy=args.aired_policy,
+                                archive=_archive(args))
     log(f"Items ready for summarization: {len(items)}")
 
     if not items:
@@ -206,91 +933,51 @@ def main():
         if args.dry_run:
             log("Dry run complete (no items).")
             return
-        # TTS single block
-        log("Synthesizing TTS (Piper) per paragraph …")
-        wav_paths = synthesize_paragraphs(
-            script,
-            OUT_DIR,
-            args.piper,
-            args.voice,
-            pause_seconds=max(0, args.pause_ms) / 1000.0,
-            length_scale=args.length_scale,
-            sentence_silence_ms=args.sentence_silence_ms,
-        )
-        mp3 = OUT_DIR / "episode.mp3"
-        log("Normalizing & encoding → MP3 …")
-        ffmpeg_join_and_normalize(wav_paths, mp3)
-        log(f"MP3 done: {mp3}")
+        render_audio(script, OUT_DIR, args.piper, args.voice, **audio_opts)
         write_notes_html(items, script)
         log("Wrote notes.html")
         return
 
+    # 1.5) Rank by relevance to the show's topic profile
+    items = rank_stage(items, args.topics, args)
+
     # 2) Summarize every item locally (unless LLM full-text mode is on)
     if args.prompt_file and args.llm_full_text:
         log("LLM full-text mode: skipping local summarization.")
-        # Ensure each item has a 'summary' field for compatibility
-        for it in items:
-            it["summary"] = it.get("text", "")
     else:
         log("Skipping local summarization (summarizer disabled).")
-        for it in items:
-            it["summary"] = it.get("text", "")
 
     # 3) Build the script: LLM-driven (prompt) if configured, else smart local fallback
-    script = None
-    if args.prompt_file:
-        try:
-            user_prompt = Path(args.prompt_file).read_text(encoding="utf-8").strip()
-            if user_prompt:
-                log("Calling LLM to draft script …")
-                script = generate_script_from_prompt(
-                    items,
-                    user_prompt=user_prompt,
-                    language=lang,
-                    prefer_full_text=args.llm_full_text,
-                )
-                log("LLM finished script.")
-        except Exception as e:
-            print(f"[warn] LLM script generation failed: {e}. Falling back to local builder.", file=sys.stderr)
-
-    if not script:
-        log("Falling back to naive concatenation …")
-        body = []
-        body.append("Welcome back to your fintech daily briefing.")  # simple intro
-        for it in items:
-            body.append(it.get("summary") or it.get("text") or it.get("title", ""))
-        body.append("That’s all for today. See you tomorrow!")  # simple outro
-        script = "\n\n".join(body)
+    script, sources = build_script(items, args.prompt_file, lang, args.llm_full_text, args.fallback_words)
+    script, covered = plan_stage(
+        script, sources, items, args.voice,
+        pause_ms=args.pause_ms,
+        length_scale=args.length_scale,
+        sentence_silence_ms=args.sentence_silence_ms,
+        target_minutes=args.target_minutes,
+        calibration=args.tts_calibration,
+    )
 
     # 4) Write script and notes
     OUT_DIR.mkdir(parents=True, exist_ok=True)
     (OUT_DIR / "script.md").write_text(script, encoding="utf-8")
     log(f"Wrote script.md ({len(script)} chars)")
-    write_notes_html(items, script)
-    log("Wrote notes.md")
+    covered = covered_items(items, covered)
+    write_notes_html(covered, script)
+    log(f"Wrote notes.html ({len(covered)} stories covered)")
 
+    log(f"Peak RSS {peak_rss_mb():.0f} MiB")
     if args.dry_run:
         log("Dry run complete (script only).")
         return
 
-    log(f"Wrote script.md ({len(script)} chars)")
-
     # 5) TTS → wav parts with pauses → mp3
-    log("Synthesizing TTS (Piper) per paragraph …")
-    wav_paths = synthesize_paragraphs(
-        script,
-        OUT_DIR,
-        args.piper,
-        args.voice,
-        pause_seconds=max(0, args.pause_ms) / 1000.0,
-    )
-    mp3 = OUT_DIR / "episode.mp3"
-    log("Normalizing & encoding → MP3 …")
-    ffmpeg_join_and_normalize(wav_paths, mp3)
-    log(f"MP3 done: {mp3}")
+    render_audio(script, OUT_DIR, args.piper, args.voice, **audio_opts)
+    record_aired(index, covered)
 
+    log(f"Peak RSS {peak_rss_mb():.0f} MiB")
     log("All done ✅")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,121 @@
+# src/planner.py
+"""
+Spoken-duration planner: predict how long the script will take to read
+before any TTS runs, and trim it to a target episode length.
+
+Prediction is linear in spoken units (letters, with digits weighted up since
+"2025" is read as several words), per voice and length_scale, plus the
+sentence silence Piper inserts. The seconds-per-unit rate is calibrated
+from the measured segments.json of each render and kept in a small JSON
+file, so predictions converge on the real voice across runs.
+"""
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+DEFAULT_SEC_PER_UNIT = 0.068    # ≈ 15 letters/s at length_scale 1.0
+DIGIT_WEIGHT = 3
+EMA_ALPHA = 0.3                 # weight of the newest run in the calibration
+
+_SENT_END = re.compile(r"[.!?]+(?:\s|$)")
+_lock = threading.Lock()
+
+
+def spoken_units(text: str) -> int:
+    letters = sum(c.isalpha() for c in text)
+    digits = sum(c.isdigit() for c in text)
+    return letters + DIGIT_WEIGHT * digits
+
+
+def _sentences(text: str) -> int:
+    return max(1, len(_SENT_END.findall(text)))
+
+
+def _key(voice: str, length_scale: float) -> str:
+    return f"{Path(voice).name}|{length_scale:g}"
+
+
+def _read(path: Path) -> Dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def load_calibration(path, voice: str, length_scale: float) -> Dict:
+    """{"sec_per_unit", "runs"} for this voice/speed, or a scaled default."""
+    cal = _read(Path(path)).get(_key(voice, length_scale))
+    if cal:
+        return cal
+    return {"sec_per_unit": DEFAULT_SEC_PER_UNIT * length_scale, "runs": 0}
+
+
+def predict_seconds(text: str, cal: Dict, sentence_silence_ms: int = 0) -> float:
+    silence = (_sentences(text) - 1) * max(0, sentence_silence_ms) / 1000.0
+    return spoken_units(text) * cal["sec_per_unit"] + silence
+
+
+def plan_script(script: str, cal: Dict, *, pause_seconds: float, sentence_silence_ms: int,
+                target_seconds: float = 0) -> Tuple[str, Dict]:
+    """
+    Predict the episode length and, if `target_seconds` is set and exceeded,
+    drop paragraphs from the end of the body (the lowest-ranked stories)
+    until it fits. The opening and closing paragraphs are always kept.
+    Returns (script, {"predicted", "original", "dropped", "kept"}), "kept"
+    being the indices of the surviving paragraphs.
+    """
+    blocks = [b.strip() for b in script.split("\n\n") if b.strip()]
+    secs = [predict_seconds(b, cal, sentence_silence_ms) for b in blocks]
+
+    def total(n_blocks: int, speech: float) -> float:
+        return speech + max(0, n_blocks - 1) * pause_seconds
+
+    original = total(len(blocks), sum(secs))
+    keep = list(range(len(blocks)))
+    speech = sum(secs)
+    if target_seconds > 0:
+        while len(keep) > 2 and total(len(keep), speech) > target_seconds:
+            drop = keep.pop(-2)
+            speech -= secs[drop]
+
+    report = {
+        "predicted": total(len(keep), speech),
+        "original": original,
+        "dropped": len(blocks) - len(keep),
+        "kept": keep,
+    }
+    return "\n\n".join(blocks[i] for i in keep), report
+
+
+def calibrate(path, voice: str, length_scale: float, script: str, manifest: Dict,
+              sentence_silence_ms: int = 0) -> Tuple[float, float]:
+    """
+    Fold a render's measured speech time into the calibration file.
+    Returns (predicted speech seconds before the update, actual seconds).
+    """
+    rate = manifest.get("sample_rate") if manifest else 0
+    speech = [s for s in manifest["segments"] if s["kind"] == "speech"] if rate else []
+    blocks = [b.strip() for b in script.split("\n\n") if b.strip()]
+    if not speech or len(speech) != len(blocks):
+        return 0.0, 0.0
+
+    path = Path(path)
+    with _lock:
+        cal = load_calibration(path, voice, length_scale)
+        predicted = sum(predict_seconds(b, cal, sentence_silence_ms) for b in blocks)
+        actual = sum(s["samples"] for s in speech) / rate
+        units = sum(spoken_units(b) for b in blocks)
+        silence = sum(_sentences(b) - 1 for b in blocks) * max(0, sentence_silence_ms) / 1000.0
+        if units and actual > silence:
+            observed = (actual - silence) / units
+            alpha = 1.0 if cal["runs"] == 0 else EMA_ALPHA
+            data = _read(path)
+            data[_key(voice, length_scale)] = {
+                "sec_per_unit": round((1 - alpha) * cal["sec_per_unit"] + alpha * observed, 6),
+                "runs": cal["runs"] + 1,
+            }
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+    return predicted, actual
@@ -0,0 +1,216 @@
+# src/profiling.py
+"""
+Opt-in per-stage profiling (main.py --profile).
+
+stage(name) wraps a pipeline stage with cProfile and tracemalloc and writes
+into the profile directory:
+  <stage>.prof        cProfile stats (snakeviz / pstats)
+  <stage>.txt         top functions by cumulative time
+  <stage>_alloc.txt   top allocation sites (tracemalloc diff)
+  summary.json        wall / CPU / child-process time and memory per stage
+Stage wall/CPU times are measured under cProfile and tracemalloc, which slow
+Python-heavy stages several-fold; PROFILE_TIMING_ONLY=1 skips both for a run
+with true timings. tracemalloc keeps PROFILE_TRACE_FRAMES frames per
+allocation (default 1; deeper traces cost much more).
+Child processes started through run() (piper, ffmpeg) are timed per
+executable, so their cost is attributed to the stage that spawned them.
+Inside scope(name) (one per show or backfill day, which run concurrently)
+stages are reported as "<name>.<stage>" so they don't overwrite each other.
+When profiling is off every helper is a thin pass-through.
+"""
+import json
+import os
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+_out_dir = None
+_lock = threading.Lock()
+_profiler_busy = False
+_summary = {}
+_children = defaultdict(lambda: {"calls": 0, "wall": 0.0})
+_timers = defaultdict(lambda: {"calls": 0, "wall": 0.0, "cpu": 0.0})
+_local = threading.local()
+_timing_only = False
+
+
+def enable(out_dir, append: bool = False) -> None:
+    """Turn profiling on. `append` keeps stages already in summary.json (e.g. feed after build)."""
+    import tracemalloc
+
+    global _out_dir, _timing_only
+    _out_dir = Path(out_dir)
+    _timing_only = os.getenv("PROFILE_TIMING_ONLY", "") not in ("", "0")
+    _out_dir.mkdir(parents=True, exist_ok=True)
+    summary = _out_dir / "summary.json"
+    if append and summary.exists():
+        try:
+            _summary.update(json.loads(summary.read_text(encoding="utf-8")).get("stages", {}))
+        except ValueError:
+            pass
+    if not _timing_only and not tracemalloc.is_tracing():
+        tracemalloc.start(int(os.getenv("PROFILE_TRACE_FRAMES", "1")))
+
+
+def enabled() -> bool:
+    return _out_dir is not None
+
+
+def run(cmd, **kwargs):
+    """subprocess.run that records wall time per executable when profiling."""
+    if not enabled():
+        return subprocess.run(cmd, **kwargs)
+    t = time.perf_counter()
+    try:
+        return subprocess.run(cmd, **kwargs)
+    finally:
+        with _lock:
+            rec = _children[os.path.basename(str(cmd[0]))]
+            rec["calls"] += 1
+            rec["wall"] += time.perf_counter() - t
+
+
+@contextmanager
+def timed(name: str):
+    """Cheap accumulating timer for sub-steps inside a stage (e.g. cleaning)."""
+    if not enabled():
+        yield
+        return
+    t, c = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        with _lock:
+            rec = _timers[name]
+            rec["calls"] += 1
+            rec["wall"] += time.perf_counter() - t
+            rec["cpu"] += time.thread_time() - c
+
+
+@contextmanager
+def scope(name: str):
+    """Prefix the stages run by this thread with `name` (e.g. a show)."""
+    prev = getattr(_local, "scope", None)
+    _local.scope = name
+    try:
+        yield
+    finally:
+        _local.scope = prev
+
+
+def _children_snapshot():
+    with _lock:
+        return {k: dict(v) for k, v in _children.items()}
+
+
+def _rusage_children():
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return ru.ru_utime + ru.ru_stime
+
+
+def _write_reports(name: str, prof, snap_before, snap_after) -> None:
+    if snap_after is None:
+        return
+    import io
+    import pstats
+
+    if prof is not None:
+        prof.dump_stats(str(_out_dir / f"{name}.prof"))
+        buf = io.StringIO()
+        pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(40)
+        (_out_dir / f"{name}.txt").write_text(buf.getvalue(), encoding="utf-8")
+
+    lines = [f"Top allocations during stage {name!r} (tracemalloc, new - old):"]
+    for st in snap_after.compare_to(snap_before, "lineno")[:25]:
+        lines.append(str(st))
+    (_out_dir / f"{name}_alloc.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@contextmanager
+def stage(name: str):
+    """Profile one pipeline stage. Nested/concurrent stages fall back to timing only."""
+    global _profiler_busy
+    if not enabled():
+        yield
+        return
+
+    import cProfile
+    import tracemalloc
+
+    prefix = getattr(_local, "scope", None)
+    if prefix:
+        name = f"{prefix}.{name}"
+
+    with _lock:
+        # only one cProfile may be active at a time
+        use_cprofile = not _timing_only and not _profiler_busy
+        _profiler_busy = _profiler_busy or use_cprofile
+
+    children_before = _children_snapshot()
+    child_cpu_before = _rusage_children()
+    snap_before = None
+    if not _timing_only:
+        snap_before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+    prof = cProfile.Profile() if use_cprofile else None
+    t, c = time.perf_counter(), time.process_time()
+    if prof is not None:
+        prof.enable()
+    try:
+        yield
+    finally:
+        if prof is not None:
+            prof.disable()
+        wall, cpu = time.perf_counter() - t, time.process_time() - c
+        peak, snap_after = None, None
+        if snap_before is not None:
+            _, peak = tracemalloc.get_traced_memory()
+            snap_after = tracemalloc.take_snapshot()
+        with _lock:
+            if use_cprofile:
+                _profiler_busy = False
+
+        child_wall = {}
+        for exe, rec in _children_snapshot().items():
+            before = children_before.get(exe, {"calls": 0, "wall": 0.0})
+            if rec["calls"] > before["calls"]:
+                child_wall[exe] = {
+                    "calls": rec["calls"] - before["calls"],
+                    "wall": round(rec["wall"] - before["wall"], 4),
+                }
+        _write_reports(name, prof, snap_before, snap_after)
+        with _lock:
+            _summary[name] = {
+                "wall": round(wall, 4),
+                "cpu": round(cpu, 4),
+                "child_cpu": round(_rusage_children() - child_cpu_before, 4),
+                "children": child_wall,
+                "py_alloc_peak_mb": None if peak is None else round(peak / (1024 * 1024), 2),
+                "cprofile": use_cprofile,
+                "tracemalloc": snap_before is not None,
+            }
+        write_summary()
+
+
+def write_summary() -> None:
+    if not enabled():
+        return
+    with _lock:
+        data = {
+            "note": ("wall/cpu are timing only (no cProfile/tracemalloc)" if _timing_only else
+                     "wall/cpu measured under cProfile (when 'cprofile') and tracemalloc, so "
+                     "Python-heavy stages read slower than in a normal run; "
+                     "rerun with PROFILE_TIMING_ONLY=1 for true timings"),
+            "stages": dict(_summary),
+            "timers": {k: {kk: round(vv, 4) if isinstance(vv, float) else vv for kk, vv in v.items()}
+                       for k, v in _timers.items()},
+            "children": {k: {"calls": v["calls"], "wall": round(v["wall"], 4)} for k, v in _children.items()},
+        }
+    (_out_dir / "summary.json").write_text(json.dumps(data, indent=2), encoding="utf-8")
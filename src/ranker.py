@@ -0,0 +1,127 @@
+# src/ranker.py
+"""
+Relevance ranking of items against the show's topic profile (BM25).
+
+The document-term matrix only has columns for profile terms, so it stays
+small (items × profile terms) and scoring is a couple of NumPy operations.
+"""
+from collections import Counter
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Tuple
+
+from src.text import words as _words
+
+K1 = 1.2
+B = 0.75
+TITLE_BOOST = 2  # title matches count this many times
+
+
+def load_profile(path) -> Dict[str, float]:
+    """
+    Read a topic profile: one term or phrase per line with an optional
+    trailing weight; '#' starts a comment. Phrases are joined with '_'.
+    """
+    profile = {}
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parts = line.rsplit(None, 1)
+        weight = 1.0
+        if len(parts) == 2:
+            try:
+                weight = float(parts[1])
+                line = parts[0]
+            except ValueError:
+                pass
+        words = _words(line)
+        if words:
+            profile["_".join(words)] = weight
+    return profile
+
+
+def _term_counts(text: str, singles: FrozenSet[str], phrases: List[str]) -> Tuple[Counter, int]:
+    """Counts of the profile's terms in `text` (other words are never counted), and its length."""
+    words = _words(text)
+    # filter → Counter runs in C and skips the item's whole vocabulary
+    counts = Counter(filter(singles.__contains__, words))
+    if phrases:
+        # str.count on the normalized text: no per-position n-gram strings
+        joined = " " + " ".join(words) + " "
+        for p in phrases:
+            c = joined.count(" " + p.replace("_", " ") + " ")
+            if c:
+                counts[p] = c
+    return counts, len(words)
+
+
+def score_items(items, profile: Dict[str, float]):
+    """BM25 score of every item against the profile, in iteration order."""
+    import numpy as np
+
+    terms = list(profile)
+    col = {t: j for j, t in enumerate(terms)}
+    phrases = [t for t in terms if "_" in t]
+    singles = frozenset(t for t in terms if "_" not in t)
+
+    # Sparse triplets; only profile terms ever reach the matrix.
+    rows, cols, vals, lengths = [], [], [], []
+    for i, it in enumerate(items):
+        counts, n_words = _term_counts(it.get("text") or "", singles, phrases)
+        title_counts, n_title = _term_counts(it.get("title") or "", singles, phrases)
+        for t, c in title_counts.items():
+            counts[t] += TITLE_BOOST * c
+        lengths.append(n_words + TITLE_BOOST * n_title)
+        for t, c in counts.items():
+            if c:
+                rows.append(i)
+                cols.append(col[t])
+                vals.append(c)
+
+    n = len(lengths)
+    if n == 0 or not terms:
+        return np.zeros(n)
+
+    tf = np.zeros((n, len(terms)), dtype=np.float32)
+    tf[np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)] = vals
+    dl = np.asarray(lengths, dtype=np.float32)
+    avgdl = max(float(dl.mean()), 1.0)
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    norm = K1 * (1.0 - B + B * dl / avgdl)
+    bm25 = tf * (K1 + 1.0) / (tf + norm[:, None])
+    weights = np.asarray([profile[t] for t in terms], dtype=np.float32)
+    return bm25 @ (idf * weights)
+
+
+def rank_items(items, profile: Dict[str, float], min_score: float = 0.0,
+               max_items: int = 0, drop: bool = False) -> Tuple[List, "np.ndarray"]:
+    """
+    Order items by relevance (stable for ties). Items scoring below
+    `min_score` are dropped if `drop`, else moved to the end. `max_items`
+    (0 = no cap) keeps only the top N.
+    Works on lists and ItemSpools: scoring streams once; for a spool (or a
+    view of one) the result is a lazy view in rank order, so no item is
+    held in memory. Returns (kept items in rank order, all scores).
+    """
+    import numpy as np
+
+    scores = score_items(items, profile)
+    order = np.argsort(-scores, kind="stable")
+    above = order[scores[order] >= min_score]
+    below = order[scores[order] < min_score]
+    keep = list(above) if drop else list(above) + list(below)
+    if max_items:
+        keep = keep[:max_items]
+
+    if hasattr(items, "pick"):
+        return items.pick([int(i) for i in keep]), scores
+
+    rank = {int(i): r for r, i in enumerate(keep)}
+    picked = [None] * len(keep)
+    for i, it in enumerate(items):
+        r = rank.get(i)
+        if r is not None:
+            picked[r] = it
+    return picked, scores
@@ -1,7 +1,6 @@
-import requests
-import feedparser
-
 def fetch_rss_items(path="feeds.txt", limit_per_feed=5):
+    import feedparser
+
     items = []
     try:
         with open(path, "r") as f:
@@ -0,0 +1,158 @@
+# src/store.py
+"""
+Local store and archive of fetched-and-cleaned newsletter messages (SQLite).
+
+Filled throughout the day by `main.py --ingest` and by every regular build;
+the scheduled build reads it with `--from_store`, and recap episodes
+(`--recap`) select from it by date range, source or full-text query
+(FTS5 over title and text). Each message also keeps its simhash so
+syndicated copies can be collapsed.
+"""
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Set
+
+from src.items import Item
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    received_at INTEGER NOT NULL,   -- Gmail internalDate (ms since epoch)
+    labels TEXT NOT NULL,           -- newline-separated
+    title TEXT,
+    source TEXT,
+    text TEXT,
+    ingested_at INTEGER NOT NULL,
+    simhash INTEGER                 -- 64-bit simhash of title + text (signed)
+);
+CREATE INDEX IF NOT EXISTS messages_received ON messages(received_at);
+"""
+
+# Full-text index over the archive, kept in sync by triggers.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    title, text, content='messages', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, title, text) VALUES (new.rowid, new.title, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, title, text) VALUES ('delete', old.rowid, old.title, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE OF title, text ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, title, text) VALUES ('delete', old.rowid, old.title, old.text);
+    INSERT INTO messages_fts (rowid, title, text) VALUES (new.rowid, new.title, new.text);
+END;
+"""
+
+
+class ItemStore:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")  # readers don't block the ingester
+        self.db.executescript(SCHEMA)
+        self._migrate()
+        self._lock = threading.Lock()
+
+    def _migrate(self) -> None:
+        """Bring stores written before the archive columns/FTS index up to date."""
+        cols = {r[1] for r in self.db.execute("PRAGMA table_info(messages)")}
+        had_fts = self.db.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'messages_fts'").fetchone() is not None
+        with self.db:
+            if "simhash" not in cols:
+                self.db.execute("ALTER TABLE messages ADD COLUMN simhash INTEGER")
+            self.db.executescript(FTS_SCHEMA)
+            if not had_fts:
+                self.db.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def known_ids(self, ids: Iterable[str]) -> Set[str]:
+        ids = list(ids)
+        found = set()
+        for i in range(0, len(ids), 500):  # stay under SQLite's variable limit
+            chunk = ids[i:i + 500]
+            q = "SELECT id FROM messages WHERE id IN (%s)" % ",".join("?" * len(chunk))
+            found.update(r[0] for r in self.db.execute(q, chunk))
+        return found
+
+    def add_labels(self, msg_id: str, labels: Iterable[str]) -> None:
+        with self._lock, self.db:
+            row = self.db.execute("SELECT labels FROM messages WHERE id = ?", (msg_id,)).fetchone()
+            if row is None:
+                return
+            merged = list(dict.fromkeys(row[0].split("\n") + list(labels)))
+            self.db.execute("UPDATE messages SET labels = ? WHERE id = ?", ("\n".join(merged), msg_id))
+
+    def put(self, msg_id: str, received_at: int, labels: Iterable[str],
+            title: str, source: str, text: str) -> None:
+        from src.story_index import fingerprint
+
+        h = None
+        if text:
+            h = fingerprint(title or "", text)[0]
+            h = h - (1 << 64) if h >= (1 << 63) else h  # SQLite integers are signed
+        labels = list(labels)
+        with self._lock, self.db:
+            row = self.db.execute("SELECT labels FROM messages WHERE id = ?", (msg_id,)).fetchone()
+            if row is not None:  # keep labels stored by other runs (see add_labels)
+                labels = list(dict.fromkeys(row[0].split("\n") + labels))
+            # Upsert (not INSERT OR REPLACE) so the FTS triggers see the update
+            # and the first ingested_at is kept
+            self.db.execute(
+                "INSERT INTO messages (id, received_at, labels, title, source, text, ingested_at, simhash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET received_at = excluded.received_at, labels = excluded.labels, "
+                "title = excluded.title, source = excluded.source, text = excluded.text, "
+                "simhash = excluded.simhash",
+                (msg_id, int(received_at or 0), "\n".join(labels), title, source, text, int(time.time()), h),
+            )
+
+    def items(self, since_ms: int, until_ms: Optional[int] = None,
+              labels: Optional[Iterable[str]] = None, source: Optional[str] = None,
+              query: Optional[str] = None, distinct: bool = False) -> Iterator[Item]:
+        """
+        Items received in [since_ms, until_ms), optionally by label, by source
+        (case-insensitive substring) and by full-text `query` (all words must
+        match). Oldest first, or best match first with a query. `distinct`
+        collapses messages with the same simhash (the same issue sent twice).
+        """
+        # Messages with an empty body are stored (so they aren't re-fetched) but skipped here
+        cols = "m.labels, m.title, m.source, m.text, m.received_at, m.simhash"
+        where = ["m.received_at >= ?", "m.text != ''"]
+        params = [int(since_ms)]
+        if until_ms is not None:
+            where.append("m.received_at < ?")
+            params.append(int(until_ms))
+        if source:
+            where.append("m.source LIKE ?")
+            params.append(f"%{source}%")
+        terms = (query or "").replace('"', " ").split()
+        if terms:
+            sql = (f"SELECT {cols} FROM messages_fts JOIN messages m ON m.rowid = messages_fts.rowid "
+                   f"WHERE messages_fts MATCH ? AND {' AND '.join(where)} ORDER BY bm25(messages_fts)")
+            params.insert(0, " ".join(f'"{t}"' for t in terms))
+        else:
+            sql = f"SELECT {cols} FROM messages m WHERE {' AND '.join(where)} ORDER BY m.received_at, m.id"
+
+        wanted = set(labels) if labels else None
+        seen = set()
+        for lbl, title, source_, text, received_at, simhash in self.db.execute(sql, params):
+            msg_labels = lbl.split("\n")
+            if wanted is not None and not wanted.intersection(msg_labels):
+                continue
+            if distinct and simhash is not None:
+                if simhash in seen:
+                    continue
+                seen.add(simhash)
+            yield Item(title=title or "Untitled", source=source_ or "Newsletter",
+                       text=text or "", labels=msg_labels, received_at=received_at)
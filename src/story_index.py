@@ -0,0 +1,157 @@
+# src/story_index.py
+"""
+Persistent index of stories aired in past episodes (SQLite).
+
+Two lookups, both indexed so they stay fast as the archive grows:
+- near-duplicates: 64-bit simhash split into four 16-bit bands; any
+  fingerprint within 3 bits of another shares at least one band exactly.
+- rewrites of the same story: an FTS5 inverted index over each item's
+  distinctive terms, with candidates confirmed by term-set Jaccard.
+"""
+import hashlib
+import sqlite3
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.text import words as _words
+
+MAX_HAMMING = 3
+MIN_JACCARD = 0.6
+TOP_TERMS = 24
+
+_STOP = frozenset("""
+about after again also been before being between could does doing from have having here
+into just like more most other over same some such than that their them then there these
+they this those through under very what when where which while will with would your
+today week weekly newsletter subscribe unsubscribe email read more click here view browser
+""".split())
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stories (
+    id INTEGER PRIMARY KEY,
+    aired_on TEXT NOT NULL,
+    title TEXT,
+    source TEXT,
+    simhash INTEGER NOT NULL,
+    b0 INTEGER, b1 INTEGER, b2 INTEGER, b3 INTEGER,
+    terms TEXT
+);
+CREATE INDEX IF NOT EXISTS stories_aired ON stories(aired_on);
+CREATE INDEX IF NOT EXISTS stories_b0 ON stories(b0);
+CREATE INDEX IF NOT EXISTS stories_b1 ON stories(b1);
+CREATE INDEX IF NOT EXISTS stories_b2 ON stories(b2);
+CREATE INDEX IF NOT EXISTS stories_b3 ON stories(b3);
+CREATE VIRTUAL TABLE IF NOT EXISTS stories_fts USING fts5(
+    terms, content='stories', content_rowid='id'
+);
+"""
+
+
+def _h64(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(counts: Counter) -> int:
+    """64-bit simhash over word counts (vectorized over unique words)."""
+    import numpy as np
+
+    if not counts:
+        return 0
+    hashes = np.array([_h64(w) for w in counts], dtype=">u8")
+    weights = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1)  # MSB first
+    acc = (np.where(bits, 1.0, -1.0) * weights[:, None]).sum(axis=0)
+    return int("".join("1" if v > 0 else "0" for v in acc), 2)
+
+
+def _signed(h: int) -> int:
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+
+def _bands(h: int) -> Tuple[int, int, int, int]:
+    return tuple((h >> s) & 0xFFFF for s in (48, 32, 16, 0))
+
+
+def fingerprint(title: str, text: str) -> Tuple[int, List[str]]:
+    """(simhash, distinctive terms) for an item."""
+    words = _words(f"{title} {text}")
+    counts = Counter(w for w in words if len(w) > 3 and w not in _STOP and not w.isdigit())
+    terms = [w for w, _ in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:TOP_TERMS]]
+    return simhash(counts), terms
+
+
+class StoryIndex:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM stories").fetchone()[0]
+
+    def find_aired(self, title: str, text: str, lookback_days: int,
+                   today: Optional[date] = None) -> Optional[dict]:
+        """
+        The aired story this item substantially matches, or None. The window is
+        the `lookback_days` before `today`; today's own episode is excluded so
+        a same-day rebuild sees the same items.
+        """
+        today = today or date.today()
+        since = (today - timedelta(days=lookback_days)).isoformat()
+        until = today.isoformat()
+        h, terms = fingerprint(title, text)
+
+        b = _bands(h)
+        rows = self.db.execute(
+            "SELECT id, simhash, title, aired_on FROM stories WHERE aired_on >= ? AND aired_on < ? "
+            "AND (b0 = ? OR b1 = ? OR b2 = ? OR b3 = ?)",
+            (since, until, *b),
+        ).fetchall()
+        for sid, other, other_title, aired_on in rows:
+            if bin((h ^ other) & ((1 << 64) - 1)).count("1") <= MAX_HAMMING:
+                return {"id": sid, "title": other_title, "aired_on": aired_on, "match": "simhash"}
+
+        if not terms:
+            return None
+        query = " OR ".join(f'"{t}"' for t in terms)
+        rows = self.db.execute(
+            "SELECT s.id, s.terms, s.title, s.aired_on FROM stories_fts "
+            "JOIN stories s ON s.id = stories_fts.rowid "
+            "WHERE stories_fts MATCH ? AND s.aired_on >= ? AND s.aired_on < ? "
+            "ORDER BY bm25(stories_fts) LIMIT 10",
+            (query, since, until),
+        ).fetchall()
+        mine = set(terms)
+        for sid, other_terms, other_title, aired_on in rows:
+            theirs = set((other_terms or "").split())
+            if theirs and len(mine & theirs) / len(mine | theirs) >= MIN_JACCARD:
+                return {"id": sid, "title": other_title, "aired_on": aired_on, "match": "terms"}
+        return None
+
+    def add(self, items, aired_on: Optional[date] = None) -> int:
+        """Record items as aired on `aired_on` (default today); re-recording is a no-op."""
+        day = (aired_on or date.today()).isoformat()
+        n = 0
+        with self.db:
+            for it in items:
+                h, terms = fingerprint(it.get("title") or "", it.get("text") or "")
+                if self.db.execute("SELECT 1 FROM stories WHERE aired_on = ? AND simhash = ?",
+                                   (day, _signed(h))).fetchone():
+                    continue
+                cur = self.db.execute(
+                    "INSERT INTO stories (aired_on, title, source, simhash, b0, b1, b2, b3, terms) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (day, it.get("title"), it.get("source"), _signed(h), *_bands(h), " ".join(terms)),
+                )
+                self.db.execute(
+                    "INSERT INTO stories_fts (rowid, terms) VALUES (?, ?)",
+                    (cur.lastrowid, " ".join(terms)),
+                )
+                n += 1
+        return n
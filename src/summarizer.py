@@ -1,10 +1,10 @@
-from transformers import pipeline
-
 _SUM = None
 
 def get_summarizer():
     global _SUM
     if _SUM is None:
+        # transformers pulls in torch; only pay for it when summarizing.
+        from transformers import pipeline
         _SUM = pipeline(
             task="summarization",
             model="sshleifer/distilbart-cnn-12-6",
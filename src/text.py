@@ -0,0 +1,68 @@
+# src/text.py
+"""
+Word tokenizer shared by the ranker, the story index and the extractive
+fallback, so that all of them see the same terms, and the matching of a
+written script's paragraphs back to the items they cover.
+"""
+import math
+import string
+from collections import Counter, defaultdict
+from typing import List, Tuple
+
+# Punctuation → space, then str.split(): several times faster than a regex
+# tokenizer on large corpora.
+_PUNCT = str.maketrans({c: " " for c in string.punctuation + "‘’“”–—…«»"})
+
+MIN_MATCH = 0.5          # share of a paragraph's (IDF-weighted) terms found in the item
+MATCH_RATIO = 0.75       # ...and not far below the paragraph's best-matching item
+
+
+def words(text: str) -> List[str]:
+    """Lower-cased words of `text`, punctuation (ASCII and typographic) removed."""
+    return text.lower().translate(_PUNCT).split()
+
+
+def _terms(text: str) -> List[str]:
+    return [w for w in words(text) if len(w) > 2 or w.isdigit()]
+
+
+def match_paragraphs(paragraphs: List[str], items) -> List[Tuple[int, ...]]:
+    """
+    For each paragraph of a written (e.g. LLM) script, the positions in
+    `items` it draws on. A paragraph matches an item when most of its
+    IDF-weighted terms (IDF over the paragraphs) appear in the item, and the
+    item is close to the paragraph's best match. An item may match several
+    paragraphs (a newsletter carries many stories) or none (its stories were
+    paraphrased beyond recognition), so callers should only use this to tell
+    which items lost *all* their paragraphs. Items are streamed once, so an
+    ItemSpool is never materialized.
+    """
+    n = len(paragraphs)
+    vecs = [Counter(_terms(p)) for p in paragraphs]
+    df = Counter(t for v in vecs for t in v)
+    idf = {t: math.log(1.0 + n / c) for t, c in df.items()}
+
+    postings = defaultdict(list)  # term → [(paragraph, weight)]
+    totals = [0.0] * n
+    for j, v in enumerate(vecs):
+        for t, c in v.items():
+            w = (1.0 + math.log(c)) * idf[t]
+            postings[t].append((j, w))
+            totals[j] += w
+
+    scores = defaultdict(list)  # paragraph → [(share, position)]
+    for pos, it in enumerate(items):
+        found = defaultdict(float)
+        for t in set(_terms(f"{it.get('title') or ''} {it.get('text') or ''}")).intersection(postings):
+            for j, w in postings[t]:
+                found[j] += w
+        for j, w in found.items():
+            share = w / totals[j]
+            if share >= MIN_MATCH:
+                scores[j].append((share, pos))
+
+    covered = []
+    for j in range(n):
+        best = max((share for share, _ in scores[j]), default=0.0)
+        covered.append(tuple(sorted(pos for share, pos in scores[j] if share >= MATCH_RATIO * best)))
+    return covered
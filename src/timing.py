@@ -0,0 +1,106 @@
+# src/timing.py
+"""
+Segment timing manifest: exact sample counts per paragraph and pause,
+recorded while the audio is produced (WAV headers only, no decoding).
+Used by feed.py for itunes:duration and by the encoder for ID3 chapters.
+"""
+import json
+import re
+import wave
+from pathlib import Path
+from typing import Dict, List
+
+SEGMENTS_NAME = "segments.json"
+
+
+def wav_info(path: Path):
+    """(frames, sample_rate, channels, sample_width) from the WAV header."""
+    with wave.open(str(path), "rb") as w:
+        return w.getnframes(), w.getframerate(), w.getnchannels(), w.getsampwidth()
+
+
+def _chapter_title(text: str, limit: int = 60) -> str:
+    first = re.split(r"(?<=[.!?])\s", " ".join(text.split()), maxsplit=1)[0]
+    if len(first) <= limit:
+        return first
+    return first[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def write_manifest(out_dir: Path, segments: List[Dict]) -> Path:
+    """
+    segments: [{"file", "kind" ("speech"|"pause"), "samples", "rate", "text"?}]
+    Adds start offsets and totals, and writes out_dir/segments.json.
+    """
+    start = 0
+    rate = segments[0]["rate"] if segments else 0
+    rows = []
+    for seg in segments:
+        row = {
+            "file": Path(seg["file"]).name,
+            "kind": seg["kind"],
+            "start_sample": start,
+            "samples": seg["samples"],
+        }
+        if seg["kind"] == "speech":
+            row["title"] = _chapter_title(seg.get("text", ""))
+        rows.append(row)
+        start += seg["samples"]
+
+    manifest = {
+        "sample_rate": rate,
+        "total_samples": start,
+        "duration": (start / rate) if rate else 0.0,
+        "segments": rows,
+    }
+    path = Path(out_dir) / SEGMENTS_NAME
+    path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return path
+
+
+def set_encoded_duration(out_dir: Path, seconds: float) -> None:
+    """
+    Record the published MP3's real length when it differs from the WAVs
+    (--segment_encode joins segments that each keep their encoder padding).
+    """
+    manifest = load_manifest(out_dir)
+    if manifest is None:
+        return
+    manifest["encoded_duration"] = round(seconds, 3)
+    (Path(out_dir) / SEGMENTS_NAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+
+def load_manifest(out_dir: Path):
+    path = Path(out_dir) / SEGMENTS_NAME
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+def chapters_from_manifest(manifest) -> List[Dict]:
+    """
+    One chapter per spoken paragraph; each chapter runs until the next one
+    starts, so the pause after a story belongs to that story.
+    Returns [{"title", "start_ms", "end_ms"}].
+    """
+    if not manifest or not manifest.get("sample_rate"):
+        return []
+    rate = manifest["sample_rate"]
+    speech = [s for s in manifest["segments"] if s["kind"] == "speech"]
+    chapters = []
+    for i, seg in enumerate(speech):
+        end = speech[i + 1]["start_sample"] if i + 1 < len(speech) else manifest["total_samples"]
+        chapters.append({
+            "title": seg.get("title") or f"Part {i + 1}",
+            "start_ms": seg["start_sample"] * 1000 // rate,
+            "end_ms": end * 1000 // rate,
+        })
+    return chapters
+
+
+def format_duration(seconds: float) -> str:
+    """itunes:duration as H:MM:SS."""
+    total = int(round(seconds))
+    return f"{total // 3600}:{(total % 3600) // 60:02d}:{total % 60:02d}"
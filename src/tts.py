@@ -1,8 +1,9 @@
 # src/tts.py
-import subprocess
 from pathlib import Path
-from typing import List
+from typing import Callable, List, Optional
 from .audio import make_silence_wav  # keep if you use synthesize_paragraphs
+from .timing import wav_info, write_manifest
+from . import profiling
 
 def _run_piper(
     text: str,
@@ -24,7 +25,7 @@ def _run_piper(
         cmd += ["--sentence-silence", str(int(sentence_silence_ms))]
 
     # IMPORTANT: do NOT pass "-s" here (that's SPEAKER index)
-    subprocess.run(cmd, input=text.encode("utf-8"), check=True)
+    profiling.run(cmd, input=text.encode("utf-8"), check=True)
 
 def synthesize_paragraphs(
     text: str,
@@ -34,11 +35,14 @@ def synthesize_paragraphs(
     pause_seconds: float = 2.0,
     length_scale: float = 1.0,
     sentence_silence_ms: int = 0,
+    on_segment: Optional[Callable[[Path, str], None]] = None,
 ) -> List[Path]:
     """
     Split the script into paragraphs.
     - One WAV per paragraph.
     - Insert silence (pause_seconds) between paragraphs.
+    - Record exact sample counts in out_dir/segments.json (see src.timing).
+    - Call on_segment(wav, "speech"|"pause") as each WAV is written, in order.
     - Return the list of WAV files.
     """
     out_dir = Path(out_dir)
@@ -46,6 +50,7 @@ def synthesize_paragraphs(
 
     blocks = [b.strip() for b in text.split("\n\n") if b.strip()]
     wav_paths: List[Path] = []
+    segments = []
 
     for i, block in enumerate(blocks, 1):
         part_wav = out_dir / f"part_{i:03d}.wav"
@@ -58,10 +63,21 @@ def synthesize_paragraphs(
             sentence_silence_ms=sentence_silence_ms,
         )
         wav_paths.append(part_wav)
+        # Header-only read: frame count, and the format the pause must match
+        frames, rate, channels, width = wav_info(part_wav)
+        segments.append({"file": part_wav, "kind": "speech", "samples": frames,
+                         "rate": rate, "text": block})
+        if on_segment:
+            on_segment(part_wav, "speech")
 
         if i < len(blocks):
             sil = out_dir / f"sil_{i:03d}.wav"
-            make_silence_wav(sil, seconds=pause_seconds)
+            _, sil_frames = make_silence_wav(sil, seconds=pause_seconds, rate=rate,
+                                             channels=channels, sample_width=width)
             wav_paths.append(sil)
+            segments.append({"file": sil, "kind": "pause", "samples": sil_frames, "rate": rate})
+            if on_segment:
+                on_segment(sil, "pause")
 
+    write_manifest(out_dir, segments)
     return wav_paths
\ No newline at end of file
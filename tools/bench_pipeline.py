@@ -0,0 +1,324 @@
+# tools/bench_pipeline.py
+"""
+Offline end-to-end benchmark: no Gmail credentials, LLM key or Piper voice needed.
+
+- Synthetic newsletter corpus (deterministic, configurable size)
+- Fake Gmail service object with the same call shape as googleapiclient
+- Fake LLM provider (patched into src.llm_writer)
+- Fake `piper` binary that writes deterministic PCM of realistic length
+
+Times build_items, script generation (LLM path and the extractive fallback),
+synthesize_paragraphs and ffmpeg_join_and_normalize (and the --segment_encode
+path: synthesis with per-segment encoding, then the lossless concat), plus
+archiving the items and a 30-day --recap select, per corpus size and writes
+a JSON report.
+
+Usage (from repo root):
+    python tools/bench_pipeline.py --sizes 10,100,1000 --out output/bench/results.json
+    python tools/bench_pipeline.py --compare output/bench/baseline.json
+"""
+import argparse
+import base64
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+WORDS = (
+    "bank fintech payments lending credit card wallet stablecoin regulator "
+    "Canada Brazil Pix BNPL Klarna Affirm Stripe Nubank Wealthsimple open banking "
+    "funding round Series valuation revenue growth margin interchange fraud "
+    "compliance onboarding merchant checkout remittance crypto custody deposit "
+    "neobank launch partnership acquisition layoffs IPO quarter customers users"
+).split()
+
+SOURCES = [
+    "Fintech Business Weekly <news@fintechbusinessweekly.com>",
+    "This Week in Fintech <hello@thisweekinfintech.com>",
+    "Fintech Brainfood <simon@fintechbrainfood.com>",
+    "Net Interest <marc@netinterest.co>",
+    "Payments Dive <newsletter@paymentsdive.com>",
+]
+
+# ~15 characters of text per second of speech at length_scale=1.0
+CHARS_PER_SECOND = 15.0
+FAKE_RATE = 22050
+
+FAKE_PIPER = '''#!{python}
+# Fake piper: reads text on stdin, writes a deterministic 16-bit mono WAV
+# whose length follows the text length and --length-scale.
+import array, hashlib, math, sys, wave
+args = sys.argv[1:]
+out = args[args.index("-f") + 1]
+scale = float(args[args.index("--length-scale") + 1]) if "--length-scale" in args else 1.0
+text = sys.stdin.buffer.read().decode("utf-8", "ignore")
+n = int(len(text) / {cps} * {rate} * scale)
+seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+period = {rate} // (110 + seed % 110)
+cycle = array.array("h", (int(3000 * math.sin(2 * math.pi * i / period)) for i in range(period)))
+pcm = (cycle * (n // period + 1))[:n]
+with wave.open(out, "wb") as w:
+    w.setnchannels(1); w.setsampwidth(2); w.setframerate({rate})
+    w.writeframes(pcm.tobytes())
+'''
+
+
+# ---------------- Synthetic corpus ----------------
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 22))]
+    return " ".join(words).capitalize() + "."
+
+
+def make_message(idx: int, rng: random.Random) -> dict:
+    paragraphs = [" ".join(_sentence(rng) for _ in range(rng.randint(3, 7)))
+                  for _ in range(rng.randint(4, 12))]
+    html = "<html><body><style>p{margin:0}</style>" + "".join(
+        f"<p>{p}</p>" for p in paragraphs) + "<script>track()</script></body></html>"
+    plain = "\n\n".join(paragraphs)
+
+    def b64(s):
+        return base64.urlsafe_b64encode(s.encode("utf-8")).decode("ascii")
+
+    return {
+        "id": f"msg{idx:06d}",
+        "threadId": f"thr{idx:06d}",
+        "internalDate": str(int(time.time() * 1000) - idx * 60_000),
+        "payload": {
+            "mimeType": "multipart/alternative",
+            "headers": [
+                {"name": "From", "value": SOURCES[idx % len(SOURCES)]},
+                {"name": "Subject", "value": f"Issue #{idx}: " + _sentence(rng)[:60]},
+            ],
+            "parts": [
+                {"mimeType": "text/plain", "body": {"data": b64(plain), "size": len(plain)}},
+                {"mimeType": "text/html", "body": {"data": b64(html), "size": len(html)}},
+            ],
+        },
+    }
+
+
+def make_corpus(n: int, seed: int = 1234) -> list:
+    rng = random.Random(seed)
+    return [make_message(i, rng) for i in range(n)]
+
+
+# ---------------- Fake Gmail ----------------
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self):
+        return self._fn()
+
+
+class FakeGmailService:
+    """Mimics svc.users().messages().list/get(...).execute() over an in-memory corpus."""
+
+    def __init__(self, messages, page_size: int = 50):
+        self._by_id = {m["id"]: m for m in messages}
+        self._ids = [m["id"] for m in messages]
+        self._page_size = page_size
+        self.calls = {"list": 0, "get": 0}
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def list(self, userId="me", q="", pageToken=None, maxResults=50, **_):
+        def run():
+            self.calls["list"] += 1
+            start = int(pageToken or 0)
+            size = min(maxResults, self._page_size)
+            page = self._ids[start:start + size]
+            resp = {"messages": [{"id": i, "threadId": i} for i in page]}
+            if start + size < len(self._ids):
+                resp["nextPageToken"] = str(start + size)
+            return resp
+        return _Request(run)
+
+    def get(self, userId="me", id=None, **_):
+        def run():
+            self.calls["get"] += 1
+            # deep copy via JSON to mimic a fresh API response
+            return json.loads(json.dumps(self._by_id[id]))
+        return _Request(run)
+
+
+# ---------------- Fake LLM ----------------
+def fake_provider_call(system_instructions: str, user_message: str) -> str:
+    """Deterministic 'LLM': one short paragraph per corpus bullet (capped)."""
+    bullets = [ln for ln in user_message.splitlines() if ln.startswith("- ")]
+    paras = ["Welcome back to your fintech daily briefing."]
+    for b in bullets[:30]:
+        paras.append(b[2:400].rsplit(" ", 1)[0] + ".")
+    paras.append("That's all for today. See you tomorrow!")
+    return "\n\n".join(paras)
+
+
+def write_fake_piper(dirpath: Path) -> Path:
+    path = dirpath / "piper"
+    path.write_text(FAKE_PIPER.format(python=sys.executable, cps=CHARS_PER_SECOND, rate=FAKE_RATE),
+                    encoding="utf-8")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
+
+
+# ---------------- Runner ----------------
+def _timed(fn, *a, **kw):
+    t = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        out = fn(*a, **kw)
+    return out, time.perf_counter() - t
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+def bench_size(n: int, work: Path, piper: Path, seed: int) -> dict:
+    import src.llm_writer as llm_writer
+    from src.main import build_items
+    from src.tts import synthesize_paragraphs
+    from src.audio import ffmpeg_join_and_normalize
+    from src.items import peak_rss_mb
+
+    svc = FakeGmailService(make_corpus(n, seed))
+    res = {"messages": n, "stages": {}, "skipped": []}
+
+    items, dt = _timed(build_items, "Bench", 1, svc=svc)
+    res["stages"]["build_items"] = round(dt, 4)
+    res["items"] = len(items)
+    res["gmail_calls"] = dict(svc.calls)
+    res["peak_rss_mb"] = round(peak_rss_mb(), 1)
+
+    llm_writer._provider_call = fake_provider_call
+    script, dt = _timed(llm_writer.generate_script_from_prompt, items,
+                        user_prompt="Benchmark run.", prefer_full_text=True)
+    res["stages"]["generate_script"] = round(dt, 4)
+    res["script_chars"] = len(script)
+
+    from src.extractive import build_extractive_script
+    fallback, dt = _timed(build_extractive_script, items, word_budget=1500)
+    res["stages"]["extractive_script"] = round(dt, 4)
+    res["fallback_words"] = len(fallback.split())  # correctness: tools/extractive_check.py
+
+    out_dir = work / f"n{n}"
+    res["stages"].update(bench_recap(items, out_dir / "archive.db"))
+
+    wavs, dt = _timed(synthesize_paragraphs, script, out_dir, str(piper), "fake.onnx",
+                      pause_seconds=1.2, length_scale=0.9)
+    res["stages"]["synthesize_paragraphs"] = round(dt, 4)
+
+    if shutil.which("ffmpeg") is None:
+        res["skipped"].append("ffmpeg_join_and_normalize")
+        return res
+
+    _, dt = _timed(ffmpeg_join_and_normalize, wavs, out_dir / "episode.mp3")
+    res["stages"]["ffmpeg_join_and_normalize"] = round(dt, 4)
+
+    # --segment_encode: encode while synthesizing, then a -c copy concat
+    from src.audio import SegmentEncoder
+    from src.timing import load_manifest
+    seg_dir = work / f"n{n}_seg"
+    encoder = SegmentEncoder(seg_dir)
+    _, dt = _timed(synthesize_paragraphs, script, seg_dir, str(piper), "fake.onnx",
+                   pause_seconds=1.2, length_scale=0.9, on_segment=encoder.submit)
+    res["stages"]["synthesize_with_segment_encode"] = round(dt, 4)
+    _, dt = _timed(encoder.finish, seg_dir / "episode.mp3", load_manifest(seg_dir))
+    res["stages"]["segment_concat"] = round(dt, 4)
+    return res
+
+
+def bench_recap(items, db_path: Path) -> dict:
+    """Archive the items spread over 30 days, then time a 30-day --recap select."""
+    from src.main import recap_items
+    from src.store import ItemStore
+
+    store = ItemStore(db_path)
+    now_ms = int(time.time() * 1000)
+    step = 30 * 86_400_000 // max(len(items), 1)
+
+    def archive():
+        for i, it in enumerate(items):
+            store.put(f"m{i}", now_ms - i * step, ["Bench"], it.title, it.source, it.text)
+
+    _, put_dt = _timed(archive)
+    _, dt = _timed(recap_items, store, "Bench", 31)
+    archived = sum(1 for _ in store.items(now_ms - 31 * 86_400_000, labels=["Bench"]))
+    assert archived == len(items), f"archive returned {archived} of {len(items)} items"
+    store.close()
+    return {"archive_items": round(put_dt, 4), "recap_items": round(dt, 4)}
+
+
+def compare(old_path: Path, new: dict) -> None:
+    old = json.loads(old_path.read_text(encoding="utf-8"))
+    old_by_n = {r["messages"]: r for r in old.get("results", [])}
+    print(f"\nComparison vs {old_path} ({old.get('meta', {}).get('git_rev', '?')}):")
+    for r in new["results"]:
+        o = old_by_n.get(r["messages"])
+        if not o:
+            continue
+        for stage, t in r["stages"].items():
+            ot = o["stages"].get(stage)
+            if ot:
+                print(f"  n={r['messages']:<5} {stage:<28} {ot:8.3f}s → {t:8.3f}s  ({t / ot:5.2f}x)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline pipeline benchmark.")
+    ap.add_argument("--sizes", default="10,100,1000", help="Comma-separated message counts.")
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--out", default="output/bench/results.json")
+    ap.add_argument("--compare", default=None, help="Previous results JSON to compare against.")
+    args = ap.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = {
+        "meta": {
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+            "ffmpeg": bool(shutil.which("ffmpeg")),
+        },
+        "results": [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix="podbench-") as tmp:
+        work = Path(tmp)
+        piper = write_fake_piper(work)
+        for n in sizes:
+            r = bench_size(n, work, piper, args.seed)
+            report["results"].append(r)
+            stages = "  ".join(f"{k}={v:.3f}s" for k, v in r["stages"].items())
+            print(f"n={n:<5} {stages}" + (f"  (skipped: {', '.join(r['skipped'])})" if r["skipped"] else ""))
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Wrote {out}")
+
+    if args.compare:
+        compare(Path(args.compare), report)
+
+
+if __name__ == "__main__":
+    main()
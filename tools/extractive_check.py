@@ -0,0 +1,92 @@
+# tools/extractive_check.py
+"""
+Regression check for the extractive fallback script (src/extractive.py).
+
+Builds the script for a saved newsletter corpus at a few word budgets and
+fails (exit 1) if the output is not deterministic, goes over budget, credits
+a paragraph to the wrong item, or differs from the saved expected output.
+After an intended change to the summarizer, review the diff and re-save
+the expected output with --update.
+
+Usage (from repo root):
+    python tools/extractive_check.py [--update]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+FIXTURES = ROOT / "tools" / "fixtures"
+CORPUS = FIXTURES / "extractive_corpus.jsonl"
+EXPECTED = FIXTURES / "extractive_expected.json"
+BUDGETS = [120, 300, 1500]
+
+
+def load_corpus(path: Path = CORPUS):
+    from src.items import Item
+
+    with open(path, encoding="utf-8") as f:
+        return [Item.from_dict(json.loads(line)) for line in f if line.strip()]
+
+
+def build(items, budget: int) -> dict:
+    from src.extractive import build_extractive
+
+    script, sources = build_extractive(items, word_budget=budget)
+    return {"script": script, "sources": [list(s) for s in sources]}
+
+
+def problems(items, budget: int, got: dict, again: dict) -> list:
+    """Invariants that hold whatever the expected output says."""
+    out = []
+    if got != again:
+        out.append("output differs between two runs")
+    words = len(got["script"].split())
+    if words > budget:
+        out.append(f"{words} words, over the budget of {budget}")
+    paragraphs = got["script"].split("\n\n")
+    if len(paragraphs) != len(got["sources"]):
+        out.append(f"{len(paragraphs)} paragraphs but {len(got['sources'])} source entries")
+    elif got["sources"][0] or got["sources"][-1]:
+        out.append("intro/outro credited to an item")
+    else:
+        for para, src in zip(paragraphs[1:-1], got["sources"][1:-1]):
+            title = items[src[0]].title.rstrip(".!?") if len(src) == 1 else None
+            if not title or not para.startswith(title):
+                out.append(f"paragraph credited to {src}: {para[:60]!r}")
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check the extractive fallback against a saved corpus.")
+    ap.add_argument("--update", action="store_true", help="Re-save the expected output.")
+    args = ap.parse_args()
+
+    items = load_corpus()
+    expected = {} if args.update else json.loads(EXPECTED.read_text(encoding="utf-8"))
+    failed = False
+    for budget in BUDGETS:
+        got = build(items, budget)
+        found = problems(items, budget, got, build(items, budget))
+        if not args.update and got != expected.get(str(budget)):
+            found.append("differs from the expected output (see --update)")
+        print(f"budget {budget:5d}: {len(got['script'].split()):5d} words, "
+              f"{len(got['sources']) - 2} items covered" + ("" if found else "  ok"))
+        for p in found:
+            print(f"[fail] budget {budget}: {p}")
+        failed = failed or bool(found)
+        expected[str(budget)] = got
+
+    if args.update and not failed:
+        EXPECTED.write_text(json.dumps(expected, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"Wrote {EXPECTED.relative_to(ROOT)}")
+    if failed:
+        sys.exit(1)
+    print("[ok] extractive fallback matches the saved corpus")
+
+
+if __name__ == "__main__":
+    main()
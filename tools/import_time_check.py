@@ -0,0 +1,89 @@
+# tools/import_time_check.py
+"""
+Import-time benchmark for the `--resume` path of src/main.py.
+
+Runs `python -X importtime` on the modules `--resume` needs, prints the
+slowest imports and fails (exit 1) if the cumulative time exceeds the
+threshold or a heavy dependency sneaks back into module-level imports.
+
+Usage (from repo root):
+    python tools/import_time_check.py [--threshold_ms 300] [--top 15]
+"""
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# What `main.py --resume` imports before it starts synthesizing.
+RESUME_MODULES = ["src.main", "src.tts", "src.audio"]
+
+# Must never be imported just to resume TTS + encode.
+HEAVY_MODULES = [
+    "googleapiclient",
+    "google.oauth2",
+    "google.generativeai",
+    "openai",
+    "bs4",
+    "lxml",
+    "requests",
+    "transformers",
+    "torch",
+]
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(modules):
+    """Return [(self_us, cumulative_us, depth, module)] from -X importtime."""
+    code = "import " + ", ".join(modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"import failed: {code}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if m:
+            depth = (len(m.group(3)) - 1) // 2
+            rows.append((int(m.group(1)), int(m.group(2)), depth, m.group(4)))
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check import time of the --resume path.")
+    ap.add_argument("--threshold_ms", type=float, default=300.0,
+                    help="Fail if the summed import time exceeds this many ms (CI runners included).")
+    ap.add_argument("--top", type=int, default=15, help="How many slow imports to list.")
+    args = ap.parse_args()
+
+    rows = measure(RESUME_MODULES)
+    total_ms = sum(r[0] for r in rows) / 1000.0
+    imported = {r[3] for r in rows}
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for self_us, cum_us, depth, mod in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+        print(f"{cum_us / 1000.0:14.1f} {self_us / 1000.0:9.1f}  {'  ' * depth}{mod}")
+    print(f"\nTotal import time for {', '.join(RESUME_MODULES)}: {total_ms:.1f} ms "
+          f"(threshold {args.threshold_ms:.0f} ms)")
+
+    leaked = sorted(h for h in HEAVY_MODULES if h in imported)
+    failed = False
+    if leaked:
+        print(f"[fail] heavy modules imported on the --resume path: {', '.join(leaked)}")
+        failed = True
+    if total_ms > args.threshold_ms:
+        print("[fail] import time over threshold")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("[ok] --resume startup is lean")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# tools/stub_token_endpoint.py
+"""
+Local stand-in for Google's OAuth token endpoint, for exercising the Gmail
+client bootstrap offline.
+
+    python tools/stub_token_endpoint.py --selftest
+        Builds the Gmail client twice against the stub with a throwaway token
+        cache; checks the second build reuses the cached token (one token
+        request in total) and that requests target gmail.googleapis.com.
+
+    python tools/stub_token_endpoint.py --port 8765
+        Just serve; point GMAIL_TOKEN_URI=http://127.0.0.1:8765/token at it.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests_seen = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        type(self).requests_seen += 1
+        body = json.dumps({
+            "access_token": f"stub-access-token-{type(self).requests_seen}",
+            "expires_in": 3600,
+            "token_type": "Bearer",
+            "scope": "https://www.googleapis.com/auth/gmail.readonly",
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port: int = 0) -> HTTPServer:
+    server = HTTPServer(("127.0.0.1", port), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def selftest() -> None:
+    from src.gmail_fetch import gmail_service
+
+    server = serve()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["GMAIL_TOKEN_URI"] = f"http://127.0.0.1:{server.server_port}/token"
+        os.environ["GMAIL_TOKEN_CACHE"] = str(Path(tmp) / "token.json")
+
+        svc = gmail_service("client-id", "client-secret", "refresh-token")
+        gmail_service("client-id", "client-secret", "refresh-token")
+        assert _Handler.requests_seen == 1, f"expected 1 token request, got {_Handler.requests_seen}"
+
+        # A different refresh token must not reuse the cached access token
+        gmail_service("client-id", "client-secret", "other-refresh-token")
+        assert _Handler.requests_seen == 2, f"expected 2 token requests, got {_Handler.requests_seen}"
+
+        req = svc.users().messages().list(userId="me", q="label:Fintech")
+        assert req.uri.startswith("https://gmail.googleapis.com/gmail/v1/users/me/messages"), req.uri
+    server.shutdown()
+    print("[ok] token cached across builds; client built from bundled discovery document")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Stub OAuth token endpoint.")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--selftest", action="store_true")
+    args = ap.parse_args()
+    if args.selftest:
+        selftest()
+        return
+    server = serve(args.port)
+    print(f"Stub token endpoint on http://127.0.0.1:{server.server_port}/token (Ctrl-C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
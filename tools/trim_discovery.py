@@ -0,0 +1,89 @@
+# tools/trim_discovery.py
+"""
+Regenerate src/discovery/gmail.v1.json: the Gmail discovery document trimmed
+to the methods this project calls, with descriptions stripped.
+
+The source is the static document shipped inside google-api-python-client
+(no network). Run after upgrading that package:
+    python tools/trim_discovery.py
+"""
+import json
+import os
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+OUT = ROOT / "src" / "discovery" / "gmail.v1.json"
+
+# resource path -> methods we keep
+KEEP = {
+    ("users",): ["getProfile"],
+    ("users", "messages"): ["list", "get"],
+    ("users", "messages", "attachments"): ["get"],
+    ("users", "labels"): ["list"],
+}
+
+TOP_LEVEL = [
+    "kind", "discoveryVersion", "id", "name", "version", "revision", "title",
+    "rootUrl", "mtlsRootUrl", "servicePath", "basePath", "baseUrl", "batchPath",
+    "protocol", "parameters", "auth",
+]
+
+
+def _strip(obj):
+    if isinstance(obj, dict):
+        return {k: _strip(v) for k, v in obj.items()
+                if k not in ("description", "enumDescriptions")}
+    if isinstance(obj, list):
+        return [_strip(v) for v in obj]
+    return obj
+
+
+def _refs(obj, out):
+    if isinstance(obj, dict):
+        if "$ref" in obj:
+            out.add(obj["$ref"])
+        for v in obj.values():
+            _refs(v, out)
+    elif isinstance(obj, list):
+        for v in obj:
+            _refs(v, out)
+
+
+def trim(doc: dict) -> dict:
+    out = {k: doc[k] for k in TOP_LEVEL if k in doc}
+    resources = {}
+    for path, methods in KEEP.items():
+        src, dst = doc, resources
+        for i, name in enumerate(path):
+            src = src["resources"][name]
+            node = dst.setdefault(name, {})
+            if i < len(path) - 1:
+                dst = node.setdefault("resources", {})
+        node.setdefault("methods", {}).update({m: src["methods"][m] for m in methods})
+    out["resources"] = resources
+
+    # keep only schemas reachable from the kept methods
+    wanted, schemas = set(), {}
+    _refs(resources, wanted)
+    while wanted:
+        name = wanted.pop()
+        if name in schemas:
+            continue
+        schemas[name] = doc["schemas"][name]
+        _refs(schemas[name], wanted)
+    out["schemas"] = schemas
+    return _strip(out)
+
+
+def main():
+    import googleapiclient
+
+    src = Path(os.path.dirname(googleapiclient.__file__)) / "discovery_cache" / "documents" / "gmail.v1.json"
+    doc = json.loads(src.read_text(encoding="utf-8"))
+    OUT.parent.mkdir(parents=True, exist_ok=True)
+    OUT.write_text(json.dumps(trim(doc), indent=1, sort_keys=True) + "\n", encoding="utf-8")
+    print(f"Wrote {OUT} ({OUT.stat().st_size} bytes, from {src.stat().st_size})")
+
+
+if __name__ == "__main__":
+    main()